@@ -0,0 +1,67 @@
+"""
+Write time, read time and file size of every compression profile for the
+root and uproot backends of fileio.save_to_root.
+
+Both backends write the same ROOT TH1, TH2 and TProfile objects from
+root_test_objects (the uproot backend converts them), and both outputs are
+read back with load_from_root. Graphs and efficiencies are left out since
+the uproot backend cannot write them.
+
+Run from the directory containing the ddfUtils package:
+
+    python -m ddfUtils.benchmarks.bench_compression [n_sets]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import ROOT
+
+from ddfUtils.root.fileio import COMPRESSION_PROFILES, load_from_root, save_to_root
+from ddfUtils.root.utils import root_test_objects
+
+
+def _make_objects(n_sets: int) -> list:
+    """A TH1, a TH2 and a TProfile per set, all uniquely named"""
+    objects = []
+    for i in range(n_sets):
+        objects.extend([
+            root_test_objects.make_TH1(1000, name=f"th1_{i}"),
+            root_test_objects.make_TH2(50, 0., 10., 50, 0., 10., name=f"th2_{i}"),
+            root_test_objects.make_TProfile_1d(100, name=f"tprofile_{i}"),
+        ])
+    return objects
+
+
+def main(n_sets: int = 200):
+    ROOT.TH1.AddDirectory(False)
+    objects = _make_objects(n_sets)
+    profiles = [None] + list(COMPRESSION_PROFILES)
+
+    print(f"{n_sets} sets: {len(objects)} objects written by both backends, read back with load_from_root")
+    print(f"{'backend':<10}{'profile':<12}{'setting':>8}{'write (s)':>12}{'read (s)':>12}{'size (MB)':>12}")
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        for backend in ("root", "uproot"):
+            for profile in profiles:
+                path = os.path.join(out_dir, f"{backend}_{profile}.root")
+
+                start_time = time.perf_counter()
+                save_to_root(objects, fout=path, backend=backend, compression=profile, overwrite=True, print_filename=False)
+                write_seconds = time.perf_counter() - start_time
+
+                start_time = time.perf_counter()
+                n_read = len(load_from_root(path, lazy=False))
+                read_seconds = time.perf_counter() - start_time
+                assert n_read == len(objects)
+
+                setting = "default" if profile is None else COMPRESSION_PROFILES[profile]
+                print(
+                    f"{backend:<10}{str(profile or '-'):<12}{setting:>8}"
+                    f"{write_seconds:>12.3f}{read_seconds:>12.3f}{os.path.getsize(path) / 1e6:>12.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main(int(float(sys.argv[1])) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,50 @@
+"""
+Per-iteration overhead of ProgressTracker.update against print_status.
+
+Run from the directory containing the ddfUtils package:
+
+    python -m ddfUtils.benchmarks.bench_progress [n_iterations]
+"""
+import contextlib
+import io
+import sys
+import time
+
+from ddfUtils.time import ProgressTracker, print_status
+
+
+def _time_loop(n: int, body) -> float:
+    start_time = time.perf_counter()
+    body(n)
+    return time.perf_counter() - start_time
+
+
+def _empty(n: int):
+    for i in range(n):
+        pass
+
+
+def _print_status(n: int):
+    start_time = time.time()
+    count = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(n):
+            count = print_status(i, n, start_time, count)
+
+
+def _progress_tracker(n: int):
+    tracker = ProgressTracker(n, stream=io.StringIO(), plain=False)
+    for i in range(n):
+        tracker.update(i)
+
+
+def main(n: int = 10**7):
+    baseline = _time_loop(n, _empty)
+    print(f"{'method':<20}{'total (s)':>12}{'overhead (ns/it)':>20}")
+    for name, body in (("print_status", _print_status), ("ProgressTracker", _progress_tracker)):
+        seconds = _time_loop(n, body)
+        print(f"{name:<20}{seconds:>12.3f}{(seconds - baseline) / n * 1e9:>20.1f}")
+
+
+if __name__ == "__main__":
+    main(int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**7)
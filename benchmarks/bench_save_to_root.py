@@ -0,0 +1,112 @@
+"""
+fileio.save_to_root against the previous recursive implementation on a
+nested dict of histograms.
+
+Run from the directory containing the ddfUtils package:
+
+    python -m ddfUtils.benchmarks.bench_save_to_root [n_hists]
+"""
+import os
+import sys
+import tempfile
+import time
+from typing import Iterable
+
+import ROOT
+
+from ddfUtils.root.fileio import save_to_root
+from ddfUtils.root.utils.root_test_objects import make_TH1
+
+
+def _save_to_root_recursive(*objects, fout, directory="", nested=False):
+    """save_to_root as it was before the directory cache, for reference."""
+    def recursive_save(obj, current_dir, path=""):
+        if isinstance(obj, ROOT.TObject):
+            current_dir.cd()
+            obj.Write()
+
+        elif isinstance(obj, dict):
+            for sub_key, sub_obj in obj.items():
+                if not nested:
+                    recursive_save(sub_obj, current_dir, path)
+                else:
+                    sub_key_str = str(sub_key)
+                    sub_dir_path = f"{path}/{sub_key_str}" if path else sub_key_str
+
+                    if not current_dir.GetDirectory(sub_key_str):
+                        current_dir.mkdir(sub_key_str)
+
+                    sub_dir = current_dir.GetDirectory(sub_key_str)
+                    recursive_save(sub_obj, sub_dir, sub_dir_path)
+
+        elif isinstance(obj, Iterable) and not isinstance(obj, (str, bytes)):
+            for sub_obj in obj:
+                recursive_save(sub_obj, current_dir, path)
+
+        else:
+            raise ValueError(f"Unsupported object type: {type(obj)}")
+
+    if not fout.GetDirectory(directory) and directory:
+        fout.mkdir(directory)
+
+    current_dir = fout.GetDirectory(directory) if directory else fout
+    for obj in objects:
+        recursive_save(obj, current_dir)
+
+    fout.cd()
+
+
+def _make_objects(n_hists: int, n_outer: int = 20, n_inner: int = 25) -> dict:
+    """{run: {station: [TH1, ...]}} with n_hists histograms in total"""
+    n_leaf = max(1, n_hists // (n_outer * n_inner))
+    return {
+        f"run_{i:06d}": {
+            f"station_{j}": [make_TH1(100, name=f"h_{i}_{j}_{k}") for k in range(n_leaf)]
+            for j in range(n_inner)
+        }
+        for i in range(n_outer)
+    }
+
+
+def _list_keys(tdir, path="") -> list:
+    keys = []
+    for key in tdir.GetListOfKeys():
+        key_path = f"{path}/{key.GetName()}"
+        keys.append((key_path, key.GetClassName()))
+        if key.IsFolder():
+            keys.extend(_list_keys(tdir.GetDirectory(key.GetName()), key_path))
+    return sorted(keys)
+
+
+def main(n_hists: int = 10**4):
+    ROOT.TH1.AddDirectory(False)
+    objects = _make_objects(n_hists)
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        old_path = os.path.join(out_dir, "recursive.root")
+        new_path = os.path.join(out_dir, "cached.root")
+
+        start_time = time.perf_counter()
+        fout = ROOT.TFile(old_path, "recreate")
+        _save_to_root_recursive(objects, fout=fout, directory="hists", nested=True)
+        fout.Close()
+        old_seconds = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        save_to_root(objects, fout=new_path, directory="hists", nested=True, print_filename=False)
+        new_seconds = time.perf_counter() - start_time
+
+        old_file, new_file = ROOT.TFile(old_path), ROOT.TFile(new_path)
+        same_layout = _list_keys(old_file) == _list_keys(new_file)
+        n_keys = len(_list_keys(new_file))
+        old_file.Close()
+        new_file.Close()
+
+        print(f"{n_keys} keys, identical layout: {same_layout}")
+        print(f"{'implementation':<20}{'time (s)':>12}{'size (MB)':>12}")
+        for name, seconds, path in (("recursive", old_seconds, old_path), ("cached", new_seconds, new_path)):
+            print(f"{name:<20}{seconds:>12.3f}{os.path.getsize(path) / 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    main(int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**4)
@@ -0,0 +1,62 @@
+"""
+Serial against thread-pool directory listing on a local tree with injected
+per-listing latency, to mimic a FUSE mount such as EOS.
+
+Run from the directory containing the ddfUtils package:
+
+    python -m ddfUtils.benchmarks.bench_walk [latency_ms]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from ddfUtils.misc import get_all_files, get_sub_dir_path
+
+
+def _make_tree(root_dir: str, n_years: int = 3, n_runs: int = 40, n_files: int = 5):
+    """convertedData-like layout: run_YYYY/run_NNNNNN/sndsw_raw-NNNN.root"""
+    for year in range(n_years):
+        for run in range(n_runs):
+            run_dir = os.path.join(root_dir, f"run_{2022 + year}", f"run_{4000 + 100 * year + run:06d}")
+            os.makedirs(os.path.join(run_dir, "histos"))
+            for i in range(n_files):
+                open(os.path.join(run_dir, f"sndsw_raw-{i:04d}.root"), "w").close()
+
+
+def _with_latency(latency: float):
+    scandir = os.scandir
+
+    def slow_scandir(path="."):
+        time.sleep(latency)
+        return scandir(path)
+
+    return scandir, slow_scandir
+
+
+def _time(func, *args, **kwargs) -> tuple:
+    start_time = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start_time, result
+
+
+def main(latency_ms: float = 5.):
+    with tempfile.TemporaryDirectory() as root_dir:
+        _make_tree(root_dir)
+
+        scandir, os.scandir = _with_latency(latency_ms / 1e3)
+        try:
+            print(f"latency per listing: {latency_ms} ms")
+            print(f"{'call':<40}{'workers':>10}{'time (s)':>12}{'found':>8}")
+            for max_workers in (None, 4, 16, 64):
+                seconds, dirs = _time(get_sub_dir_path, "histos", root_dir, max_workers=max_workers)
+                print(f"{'get_sub_dir_path':<40}{str(max_workers or '-'):>10}{seconds:>12.3f}{len(dirs):>8}")
+            for max_workers in (None, 4, 16, 64):
+                seconds, files = _time(get_all_files, root_dir, "run_*/run_*/sndsw_raw-*.root", max_workers=max_workers)
+                print(f"{'get_all_files':<40}{str(max_workers or '-'):>10}{seconds:>12.3f}{len(files):>8}")
+        finally:
+            os.scandir = scandir
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 5.)
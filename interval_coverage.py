@@ -0,0 +1,158 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Union
+
+import numpy as np
+import pandas as pd
+from scipy.stats import binom
+
+from .stats import _STAT_OPTIONS, _resolve_stat_option, get_interval_bounds
+
+# TEfficiency static function and extra (alpha, beta) prior arguments per method
+_ROOT_INTERVALS = {
+    "normal":          ("Normal",         ()),
+    "clopper_pearson": ("ClopperPearson", ()),
+    "bayesian":        ("Bayesian",       (1., 1.)),
+    "wilson":          ("Wilson",         ()),
+    "feldman_cousins": ("FeldmanCousins", ()),
+    "agresti_coull":   ("AgrestiCoull",   ()),
+    "mid_p_interval":  ("MidPInterval",   ()),
+    "jeffrey":         ("Bayesian",       (0.5, 0.5)),
+    "uniform_prior":   ("Bayesian",       (1., 1.)),
+}
+
+
+def _get_root_bounds(passed, total, stat_option: str, cl: float) -> tuple:
+    """Interval bounds from the TEfficiency static functions, one bin at a time."""
+    import ROOT
+
+    func_name, prior = _ROOT_INTERVALS[stat_option]
+    func = getattr(ROOT.TEfficiency, func_name)
+
+    lower = np.array([func(float(n), float(k), cl, *prior, False) for k, n in zip(passed, total)])
+    upper = np.array([func(float(n), float(k), cl, *prior, True)  for k, n in zip(passed, total)])
+
+    return lower, upper
+
+
+def _get_bounds(passed, total, stat_option: str, cl: float, source: str) -> tuple:
+    if source == "stats":
+        return get_interval_bounds(passed, total, stat_option, cl=cl)
+    elif source == "root":
+        return _get_root_bounds(passed, total, stat_option, cl)
+    else:
+        raise ValueError(f"Invalid source '{source}'! Allowed sources are: stats, root")
+
+
+def _get_coverage_for_n(stat_option: str, n: int, p_values: np.ndarray, cl: float, source: str) -> dict:
+    """
+    Exact coverage and mean length of one method for `n` trials.
+
+    Both are binomial sums over every possible outcome k = 0..n, weighted by
+    P(k | n, p), evaluated for all true p at once.
+    """
+    k = np.arange(n + 1)
+    lower, upper = _get_bounds(k, np.full(n + 1, n), stat_option, cl, source)
+
+    p = p_values[:, None]
+    pmf = binom.pmf(k[None, :], n, p)
+    covered = (lower[None, :] <= p) & (p <= upper[None, :])
+
+    return {
+        "stat_option": stat_option,
+        "n":           n,
+        "p":           p_values,
+        "coverage":    np.sum(pmf * covered, axis=1),
+        "mean_length": pmf @ (upper - lower),
+    }
+
+
+def get_interval_coverage(
+    stat_options: Union[Iterable[str], None] = None,
+    n_values:     Iterable[int] = range(1, 101),
+    p_values:     Union[Iterable[float], None] = None,
+    cl:           float = 0.6826894921370859,
+    source:       str   = "stats",
+    n_workers:    Union[int, None] = 1
+) -> pd.DataFrame:
+    """
+    Calculate the frequentist coverage and mean length of interval methods.
+
+    For every method, number of trials n and true efficiency p the coverage
+    sum_k P(k | n, p) * [L_k <= p <= U_k] and the mean length
+    sum_k P(k | n, p) * (U_k - L_k) are computed exactly. The (method, n)
+    grid points are spread over `n_workers` processes (None uses every CPU).
+
+    Args:
+        stat_options: Methods to evaluate, with any alias accepted by
+            stats.get_eff_with_error (default is all nine)
+        n_values: Numbers of trials
+        p_values: True efficiencies (default is 199 points in [0.005, 0.995])
+        cl: Confidence level (default is 1-sigma)
+        source: 'stats' for the NumPy implementations or 'root' for the
+            TEfficiency static functions behind teff.set_stat_option
+        n_workers: Number of worker processes
+
+    Returns:
+        pandas.DataFrame: Columns stat_option, n, p, coverage, mean_length
+    """
+    stat_options = list(_STAT_OPTIONS) if stat_options is None else [_resolve_stat_option(s) for s in stat_options]
+    p_values = np.linspace(0.005, 0.995, 199) if p_values is None else np.asarray(p_values, dtype=np.float64)
+
+    tasks = [(s, int(n)) for s in stat_options for n in n_values]
+    args = (
+        [s for s, _ in tasks], [n for _, n in tasks],
+        [p_values] * len(tasks), [cl] * len(tasks), [source] * len(tasks)
+    )
+
+    if n_workers == 1:
+        results = list(map(_get_coverage_for_n, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            results = list(executor.map(_get_coverage_for_n, *args, chunksize=max(1, len(tasks) // 64)))
+
+    return pd.concat([pd.DataFrame(r) for r in results], ignore_index=True)
+
+
+def benchmark_interval_methods(
+    stat_options: Union[Iterable[str], None] = None,
+    n_bins:       int   = 10**6,
+    max_total:    int   = 100,
+    cl:           float = 0.6826894921370859,
+    source:       str   = "stats",
+    seed:         int   = 42
+) -> pd.DataFrame:
+    """
+    Time every interval method on `n_bins` random (passed, total) pairs.
+
+    Args:
+        stat_options: Methods to time (default is all nine)
+        n_bins: Number of bins per call
+        max_total: Largest number of trials per bin
+        cl: Confidence level (default is 1-sigma)
+        source: 'stats' or 'root', see get_interval_coverage
+        seed: Seed of the random counts
+
+    Returns:
+        pandas.DataFrame: Columns stat_option, n_bins, seconds, bins_per_second
+    """
+    stat_options = list(_STAT_OPTIONS) if stat_options is None else [_resolve_stat_option(s) for s in stat_options]
+
+    rng = np.random.default_rng(seed)
+    total  = rng.integers(0, max_total + 1, n_bins)
+    passed = rng.integers(0, total + 1)
+
+    rows = []
+    for stat_option in stat_options:
+        start_time = time.perf_counter()
+        _get_bounds(passed, total, stat_option, cl, source)
+        seconds = time.perf_counter() - start_time
+
+        rows.append({
+            "stat_option":     stat_option,
+            "n_bins":          n_bins,
+            "seconds":         seconds,
+            "bins_per_second": n_bins / seconds,
+        })
+
+    return pd.DataFrame(rows)
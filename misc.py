@@ -1,31 +1,747 @@
+import fnmatch
 import glob
+import heapq
 import os
+import re
+import sqlite3
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Callable, Iterable, Iterator, NamedTuple, Union
+
+
+def get_cache_dir() -> str:
+    """
+    Return the directory for ddfUtils caches, $DDFUTILS_CACHE_DIR or ~/.cache/ddfUtils.
+    """
+    return os.environ.get(
+        "DDFUTILS_CACHE_DIR",
+        os.path.join(os.path.expanduser("~"), ".cache", "ddfUtils")
+    )
+
+
+def _get_pruner(prune: Union[str, Iterable[str], Callable, None]) -> Callable:
+    """Turn fnmatch pattern(s) or a predicate on directory names into a predicate."""
+    if prune is None:
+        return lambda name: False
+    if callable(prune):
+        return prune
+    patterns = [prune] if isinstance(prune, str) else list(prune)
+    return lambda name: any(fnmatch.fnmatchcase(name, p) for p in patterns)
+
+
+class DirectoryIndex:
+    """
+    Persistent SQLite index of a directory tree for repeated searches.
+
+    Every directory is stored with its mtime and the names of its
+    subdirectories. A later walk only stats each indexed directory and lists
+    again those whose mtime changed, which on FUSE mounts such as EOS is far
+    cheaper than a full os.walk. With `max_age` > 0, directories checked less
+    than `max_age` seconds ago are trusted without even a stat.
+
+    Args:
+        path: SQLite file (default is dir_index.sqlite in get_cache_dir())
+    """
+
+    def __init__(self, path: Union[str, None] = None):
+        if path is None:
+            os.makedirs(get_cache_dir(), exist_ok=True)
+            path = os.path.join(get_cache_dir(), "dir_index.sqlite")
+        self.path = path
+
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS dirs ("
+            "path TEXT PRIMARY KEY, mtime REAL, checked REAL, children TEXT)"
+        )
+        self._db.commit()
+
+
+    def close(self):
+        self._db.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+    def _load(self, root_dir: str) -> dict:
+        prefix = root_dir.rstrip("/") + "/"
+        rows = self._db.execute(
+            "SELECT path, mtime, checked, children FROM dirs WHERE path = ? OR substr(path, 1, ?) = ?",
+            (root_dir, len(prefix), prefix)
+        )
+        return {
+            path: (mtime, checked, children.split("\0") if children else [])
+            for path, mtime, checked, children in rows
+        }
+
+
+    def walk(
+        self,
+        root_dir:  str,
+        max_depth: Union[int, None] = None,
+        prune:     Union[str, Iterable[str], Callable, None] = None,
+        max_age:   float = 0.
+    ) -> Iterator[str]:
+        """
+        Yield every directory below (and including) `root_dir`, in sorted
+        depth-first order, updating the index on the way.
+
+        Args:
+            root_dir: Top of the tree
+            max_depth: Do not descend below this depth (root_dir is depth 0)
+            prune: fnmatch pattern(s) or predicate on directory names; matching
+                directories are yielded but not descended into
+            max_age: Trust index entries checked less than this many seconds ago
+        """
+        root_dir = os.path.normpath(root_dir)
+        is_pruned = _get_pruner(prune)
+        index = self._load(root_dir)
+        updates, removed = [], []
+        now = time.time()
+
+        stack = [(root_dir, 0)]
+        try:
+            while stack:
+                path, depth = stack.pop()
+                yield path
+
+                if (max_depth is not None and depth >= max_depth) or (depth > 0 and is_pruned(os.path.basename(path))):
+                    continue
+
+                entry = index.get(path)
+                if entry is not None and now - entry[1] < max_age:
+                    children = entry[2]
+                else:
+                    try:
+                        mtime = os.stat(path).st_mtime
+                    except OSError:
+                        removed.append(path)
+                        continue
+
+                    if entry is not None and entry[0] == mtime:
+                        children = entry[2]
+                    else:
+                        with os.scandir(path) as it:
+                            children = sorted(e.name for e in it if e.is_dir(follow_symlinks=False))
+                        if entry is not None:
+                            removed.extend(os.path.join(path, c) for c in set(entry[2]) - set(children))
+                    updates.append((path, mtime, now, "\0".join(children)))
+
+                stack.extend((os.path.join(path, c), depth + 1) for c in reversed(children))
+        finally:
+            self._store(updates, removed)
+
+
+    def _store(self, updates: list, removed: list):
+        with self._db:
+            for path in removed:
+                prefix = path + "/"
+                self._db.execute(
+                    "DELETE FROM dirs WHERE path = ? OR substr(path, 1, ?) = ?",
+                    (path, len(prefix), prefix)
+                )
+            self._db.executemany("INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?)", updates)
+
+
+def _list_dir(path: str, followlinks: bool = False, with_id: bool = False) -> tuple:
+    """
+    Return (dirnames, filenames, dir_id) of `path`, or empty lists if it
+    cannot be listed. With `followlinks`, symlinks to directories count as
+    directories. dir_id is the (st_dev, st_ino) of `path` if `with_id`, else None.
+    """
+    dirnames, filenames, dir_id = [], [], None
+    try:
+        if with_id:
+            stat = os.stat(path)
+            dir_id = (stat.st_dev, stat.st_ino)
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=followlinks)
+                except OSError:
+                    is_dir = False
+                (dirnames if is_dir else filenames).append(entry.name)
+    except OSError:
+        pass
+    return dirnames, filenames, dir_id
+
+
+def parallel_walk(
+    root_dir:      str,
+    max_workers:   int = 16,
+    max_in_flight: Union[int, None] = None,
+    max_depth:     Union[int, None] = None,
+    prune:         Union[str, Iterable[str], Callable, None] = None,
+    ordered:       bool = False,
+    followlinks:   bool = False
+) -> Iterator[tuple]:
+    """
+    Walk a directory tree with concurrent os.scandir calls.
+
+    On high-latency mounts (EOS FUSE) a walk is bound by the round trip of
+    each listing, so listings are issued from a thread pool with at most
+    `max_in_flight` outstanding at any time. Directories are yielded in
+    completion order, or with `ordered` in sorted depth-first order, with the
+    listings of the next directories in that order prefetched. As with
+    os.walk, removing names from the yielded dirnames keeps the walk from
+    descending into them.
+
+    With `followlinks`, symlinks to directories are listed in dirnames and
+    descended into like glob does. Without `max_depth`, a directory that is
+    one of its own ancestors (a symlink loop) is skipped so that the walk
+    ends.
+
+    Args:
+        root_dir: Top of the tree
+        max_workers: Number of threads
+        max_in_flight: Maximum number of concurrent listings (default is max_workers)
+        max_depth: Do not descend below this depth (root_dir is depth 0)
+        prune: fnmatch pattern(s) or predicate on directory names that are
+            not descended into
+        ordered: Yield in sorted depth-first order with sorted dirnames and
+            filenames
+        followlinks: Descend into symlinks to directories
+
+    Yields:
+        tuple: (dirpath, dirnames, filenames) as in os.walk
+    """
+    max_in_flight = max_workers if max_in_flight is None else max_in_flight
+    is_pruned = _get_pruner(prune)
+    check_loops = followlinks and max_depth is None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        if ordered:
+            walk = _walk_ordered(executor, root_dir, max_in_flight, followlinks, check_loops)
+        else:
+            walk = _walk_unordered(executor, root_dir, max_in_flight, followlinks, check_loops)
+
+        for path, depth, dirnames, filenames, descend in walk:
+            yield path, dirnames, filenames
+
+            if max_depth is None or depth < max_depth:
+                descend(d for d in dirnames if not is_pruned(d))
+
+
+def _walk_unordered(
+    executor:      ThreadPoolExecutor,
+    root_dir:      str,
+    max_in_flight: int,
+    followlinks:   bool,
+    check_loops:   bool
+) -> Iterator[tuple]:
+    """
+    Drive parallel_walk in completion order. Every item carries a callback
+    taking the names of the subdirectories to descend into.
+    """
+    # (path, depth, ids of the ancestors when checking for loops)
+    todo = deque([(root_dir, 0, ())])
+    pending = {}
+
+    while todo or pending:
+        while todo and len(pending) < max_in_flight:
+            path, depth, ancestors = todo.popleft()
+            pending[executor.submit(_list_dir, path, followlinks, check_loops)] = (path, depth, ancestors)
+
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            path, depth, ancestors = pending.pop(future)
+            dirnames, filenames, dir_id = future.result()
+            if dir_id is not None and dir_id in ancestors:
+                continue
+            ancestors += (dir_id,) if dir_id is not None else ()
+            yield path, depth, dirnames, filenames, lambda names: todo.extend(
+                (os.path.join(path, d), depth + 1, ancestors) for d in names
+            )
+
+
+def _walk_ordered(
+    executor:      ThreadPoolExecutor,
+    root_dir:      str,
+    max_in_flight: int,
+    followlinks:   bool,
+    check_loops:   bool
+) -> Iterator[tuple]:
+    """
+    Drive parallel_walk in sorted depth-first order. The listings of the
+    next `max_in_flight` directories on the stack are kept submitted.
+    """
+    # [path, depth, ids of the ancestors when checking for loops, future];
+    # the next directory to yield is at the end
+    stack = [[root_dir, 0, (), None]]
+    n_submitted = 0
+
+    while stack:
+        for item in reversed(stack):
+            if n_submitted >= max_in_flight:
+                break
+            if item[3] is None:
+                item[3] = executor.submit(_list_dir, item[0], followlinks, check_loops)
+                n_submitted += 1
+
+        path, depth, ancestors, future = stack.pop()
+        n_submitted -= 1
+        dirnames, filenames, dir_id = future.result()
+        if dir_id is not None and dir_id in ancestors:
+            continue
+        ancestors += (dir_id,) if dir_id is not None else ()
+        dirnames.sort()
+        filenames.sort()
+
+        yield path, depth, dirnames, filenames, lambda names: stack.extend(
+            [os.path.join(path, d), depth + 1, ancestors, None] for d in sorted(names, reverse=True)
+        )
+
+
+def iter_sub_dir_paths(
+    top_dir:     str,
+    root_dir:    str = "/eos/experiment/sndlhc/convertedData/physics",
+    max_depth:   Union[int, None] = None,
+    prune:       Union[str, Iterable[str], Callable, None] = None,
+    index:       Union[DirectoryIndex, str, bool, None] = None,
+    max_age:     float = 0.,
+    max_workers: Union[int, None] = None,
+    ordered:     bool = False
+) -> Iterator[str]:
+    """
+    Yield full paths to subdirectories named `top_dir` below `root_dir` as
+    soon as they are found. See get_sub_dir_path for the arguments.
+
+    Args:
+        ordered: Yield in a deterministic (sorted depth-first) order. With a
+            DirectoryIndex the order is always sorted.
+    """
+    if index:
+        if not isinstance(index, DirectoryIndex):
+            with DirectoryIndex(None if index is True else index) as dir_index:
+                yield from iter_sub_dir_paths(top_dir, root_dir, max_depth, prune, dir_index, max_age)
+            return
+        for path in index.walk(root_dir, max_depth, prune, max_age):
+            if os.path.basename(path) == top_dir:
+                yield path
+        return
+
+    is_pruned = _get_pruner(prune)
+    root_depth = os.path.normpath(root_dir).count(os.sep)
+
+    if max_workers:
+        walk = parallel_walk(root_dir, max_workers, max_depth=max_depth, ordered=ordered)
+    else:
+        walk = os.walk(root_dir)
+
+    for dirpath, dirnames, _ in walk:
+        if ordered:
+            dirnames.sort()
+        if os.path.basename(dirpath) == top_dir:
+            yield dirpath
+
+        depth = os.path.normpath(dirpath).count(os.sep) - root_depth
+        if max_depth is not None and depth >= max_depth:
+            dirnames[:] = []
+        else:
+            # Pruned directories can still match, they are just not descended into
+            for d in dirnames:
+                if is_pruned(d) and d == top_dir:
+                    yield os.path.join(dirpath, d)
+            dirnames[:] = [d for d in dirnames if not is_pruned(d)]
 
 
 def get_sub_dir_path(
-    top_dir:  str,
-    root_dir: str = "/eos/experiment/sndlhc/convertedData/physics"
+    top_dir:     str,
+    root_dir:    str = "/eos/experiment/sndlhc/convertedData/physics",
+    max_depth:   Union[int, None] = None,
+    prune:       Union[str, Iterable[str], Callable, None] = None,
+    index:       Union[DirectoryIndex, str, bool, None] = None,
+    max_age:     float = 0.,
+    max_workers: Union[int, None] = None
 ):
     """
     Return a list of full paths to subdirectories named `top_dir`,
     starting from `root_path`.
+
+    Args:
+        top_dir: Directory name to look for
+        root_dir: Directory to start from
+        max_depth: Do not descend below this depth (root_dir is depth 0)
+        prune: fnmatch pattern(s) or predicate on directory names that are
+            not descended into, e.g. "run_*"
+        index: Use a DirectoryIndex (True for the default one, or its path)
+            instead of a full os.walk
+        max_age: See DirectoryIndex.walk
+        max_workers: List directories concurrently with parallel_walk using
+            this many threads; the result is then sorted
     """
+    matchingDirs = list(iter_sub_dir_paths(top_dir, root_dir, max_depth, prune, index, max_age, max_workers))
+    return sorted(matchingDirs) if max_workers and not index else matchingDirs
+
+
+def _list_names(path: str, dironly: bool) -> list:
+    """Names in `path` in os.scandir order, only directories if `dironly`, as glob lists them."""
+    names = []
+    try:
+        with os.scandir(path or os.curdir) as it:
+            for entry in it:
+                try:
+                    if not dironly or entry.is_dir():
+                        names.append(entry.name)
+                except OSError:
+                    pass
+    except OSError:
+        pass
+    return names
 
-    matchingDirs = []
-    for dirpath, dirnames, _ in os.walk(root_dir):
-        if os.path.basename(dirpath) == top_dir:
-            matchingDirs.append(dirpath)
-    return matchingDirs
 
-def get_all_files(input_dir: str, files: str) -> list:
+def _glob_in_dir(path: str, pattern: str, dironly: bool, ordered: bool) -> list:
+    """Names in directory `path` matching one component of a glob pattern."""
+    if not glob.has_magic(pattern):
+        # A literal component (or '' after a trailing slash) is only checked for existence
+        if pattern:
+            return [pattern] if os.path.lexists(os.path.join(path, pattern)) else []
+        return [pattern] if os.path.isdir(path) else []
+    return _match_names(_list_names(path, dironly), pattern, ordered)
+
+
+def _iter_glob(pattern: str, map_dirs: Callable, ordered: bool) -> Iterator[str]:
+    """
+    glob.iglob evaluated one pattern component at a time, with the
+    directories of each level listed through `map_dirs` (map or
+    Executor.map). Paths are joined as glob joins them and, unless
+    `ordered`, come out in the same order.
+    """
+    if not glob.has_magic(pattern):
+        yield from glob.glob(pattern)
+        return
+
+    # Split like glob: a literal leading directory, then one component per level
+    path, components = pattern, []
+    while True:
+        head, tail = os.path.split(path)
+        components.insert(0, tail)
+        if head and head != path and glob.has_magic(head):
+            path = head
+        else:
+            break
+
+    dirs = [head]
+    for depth, component in enumerate(components):
+        is_last = depth == len(components) - 1
+        matches = map_dirs(partial(_glob_in_dir, pattern=component, dironly=not is_last, ordered=ordered), dirs)
+        paths = (os.path.join(d, name) for d, names in zip(dirs, matches) for name in names)
+        if is_last:
+            yield from paths
+        else:
+            dirs = list(paths)
+
+
+def iter_files(
+    input_dir:   str,
+    files:       str,
+    max_workers: Union[int, None] = None,
+    ordered:     bool = False
+) -> Iterator[str]:
+    """
+    Yield the paths matching glob pattern f"{input_dir}/{files}" as soon as
+    they are found.
+
+    The result is the same as glob.iglob, including glob patterns in
+    `input_dir`. With `max_workers`, the directories matched by each pattern
+    component are listed concurrently, so "run_*/sndsw_raw-*.root" lists
+    `input_dir` and then every run_* directory at once.
+
+    Args:
+        input_dir: Directory path to search in, may contain glob patterns
+        files: File pattern to match
+        max_workers: List directories concurrently using this many threads
+        ordered: Yield in a deterministic order, with the names matched by
+            every pattern component sorted
+    """
+    pattern = f"{input_dir}/{files}"
+
+    if not max_workers:
+        if ordered:
+            yield from _iter_glob(pattern, map, ordered)
+        else:
+            yield from glob.iglob(pattern)
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        yield from _iter_glob(pattern, executor.map, ordered)
+
+
+def _match_names(names: list, pattern: str, ordered: bool) -> list:
+    """fnmatch.filter with glob's handling of names starting with a dot."""
+    if not pattern.startswith("."):
+        names = [n for n in names if not n.startswith(".")]
+    names = fnmatch.filter(names, pattern)
+    return sorted(names) if ordered else names
+
+
+def _match_glob(path: str, pattern: str) -> bool:
+    """
+    Whether glob could return `path` for `pattern`: every component matches
+    its own pattern component, so '*' never matches '/'.
+    """
+    path_parts    = [p for p in path.split("/") if p]
+    pattern_parts = [p for p in pattern.split("/") if p]
+    if path.startswith("/") != pattern.startswith("/") or len(path_parts) != len(pattern_parts):
+        return False
+    return all(
+        _match_names([name], part, False) if glob.has_magic(part) else name == part
+        for name, part in zip(path_parts, pattern_parts)
+    )
+
+
+def get_all_files(input_dir: str, files: str, max_workers: Union[int, None] = None) -> list:
     """
     Get list of all files matching pattern in a directory.
 
     Args:
         inputDir: Directory path to search in
         files: File pattern to match
+        max_workers: List the directories matched by each pattern component
+            concurrently using this many threads; the result is the same
 
     Returns:
         list: List of files matching the pattern
     """
+    if max_workers:
+        return list(iter_files(input_dir, files, max_workers))
     return glob.glob(f"{input_dir}/{files}")
+
+
+_RUN_RE       = re.compile(r"run_?(\d+)")
+_PARTITION_RE = re.compile(r"-(\d+)\.root$")
+
+
+def parse_run_partition(path: str) -> tuple:
+    """
+    Parse run and partition numbers from an SND@LHC converted-data path,
+    e.g. .../run_2022/run_004612/sndsw_raw-0003.root -> (4612, 3).
+
+    The run is taken from the last run_NNNNNN component. Numbers that
+    cannot be parsed are returned as None.
+    """
+    runs = _RUN_RE.findall(path)
+    partition = _PARTITION_RE.search(path)
+    return (
+        int(runs[-1]) if runs else None,
+        int(partition.group(1)) if partition else None
+    )
+
+
+def _stat_or_none(path: str):
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+class CatalogEntry(NamedTuple):
+    path:      str
+    run:       Union[int, None]
+    partition: Union[int, None]
+    size:      int
+    mtime:     float
+
+
+class FileCatalog:
+    """
+    Persistent SQLite catalog of data files with their run, partition, size
+    and mtime, indexed on (run, partition).
+
+    Files are stat'ed once by `scan`/`add`; `query` and `balance` then work
+    from the catalog alone without touching the filesystem.
+
+    Args:
+        path: SQLite file (default is file_catalog.sqlite in get_cache_dir())
+    """
+
+    def __init__(self, path: Union[str, None] = None):
+        if path is None:
+            os.makedirs(get_cache_dir(), exist_ok=True)
+            path = os.path.join(get_cache_dir(), "file_catalog.sqlite")
+        self.path = path
+
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, run INTEGER, partition INTEGER, size INTEGER, mtime REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS files_run_partition ON files (run, partition)")
+        self._db.commit()
+
+
+    def close(self):
+        self._db.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+
+    def add(self, paths: Iterable[str], max_workers: Union[int, None] = None) -> int:
+        """
+        Stat `paths` and add or update them in the catalog. Files that no
+        longer exist are removed from it.
+
+        Args:
+            paths: File paths
+            max_workers: Stat the files concurrently using this many threads
+
+        Returns:
+            int: Number of files cataloged
+        """
+        paths = list(paths)
+        if max_workers:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                stats = list(executor.map(_stat_or_none, paths))
+        else:
+            stats = [_stat_or_none(p) for p in paths]
+
+        rows, missing = [], []
+        for path, st in zip(paths, stats):
+            if st is None:
+                missing.append((path,))
+            else:
+                rows.append((path, *parse_run_partition(path), st.st_size, st.st_mtime))
+
+        with self._db:
+            self._db.executemany("DELETE FROM files WHERE path = ?", missing)
+            self._db.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+
+    def scan(
+        self,
+        input_dir:   str,
+        files:       str = "run_*/sndsw_raw-*.root",
+        max_workers: Union[int, None] = None
+    ) -> int:
+        """
+        Catalog every file matching `files` in `input_dir` (see get_all_files)
+        and drop entries below `input_dir` matching the pattern that are gone.
+
+        Args:
+            input_dir: Directory path to search in
+            files: File pattern to match
+            max_workers: List and stat concurrently using this many threads
+
+        Returns:
+            int: Number of files cataloged
+        """
+        paths = get_all_files(input_dir, files, max_workers)
+        pattern = f"{input_dir}/{files}"
+
+        found = set(paths)
+        stale = [
+            (p,) for p, in self._db.execute("SELECT path FROM files")
+            if p not in found and _match_glob(p, pattern)
+        ]
+        with self._db:
+            self._db.executemany("DELETE FROM files WHERE path = ?", stale)
+        return self.add(paths, max_workers)
+
+
+    def query(
+        self,
+        run_min:        Union[int, None] = None,
+        run_max:        Union[int, None] = None,
+        max_partitions: Union[int, None] = None
+    ) -> list:
+        """
+        Return catalog entries sorted by run and partition.
+
+        Args:
+            run_min: Smallest run number (inclusive)
+            run_max: Largest run number (inclusive)
+            max_partitions: Only the first this many partitions of every run
+
+        Returns:
+            list: CatalogEntry tuples
+        """
+        where, params = [], []
+        if run_min is not None:
+            where.append("run >= ?")
+            params.append(run_min)
+        if run_max is not None:
+            where.append("run <= ?")
+            params.append(run_max)
+        where = f"WHERE {' AND '.join(where)}" if where else ""
+
+        sql = (
+            "SELECT path, run, partition, size, mtime, "
+            "ROW_NUMBER() OVER (PARTITION BY run ORDER BY partition, path) AS rank "
+            f"FROM files {where}"
+        )
+        if max_partitions is not None:
+            sql = f"SELECT * FROM ({sql}) WHERE rank <= ?"
+            params.append(max_partitions)
+        sql += " ORDER BY run, partition, path"
+
+        return [CatalogEntry(*row[:5]) for row in self._db.execute(sql, params)]
+
+
+    def balance(
+        self,
+        n_chunks:       int,
+        run_min:        Union[int, None] = None,
+        run_max:        Union[int, None] = None,
+        max_partitions: Union[int, None] = None,
+        contiguous:     bool = False
+    ) -> list:
+        """
+        Split the files selected as in `query` into `n_chunks` chunks of
+        about equal total size, e.g. one per batch job.
+
+        By default files are assigned largest first to the currently smallest
+        chunk, which gives the most even sizes. With `contiguous`, the
+        (run, partition) order is kept and the list is cut at byte
+        boundaries, so every chunk covers a consecutive range of runs.
+
+        Args:
+            n_chunks: Number of chunks
+            run_min, run_max, max_partitions: See query
+            contiguous: Keep files in order
+
+        Returns:
+            list: `n_chunks` lists of paths, each sorted by run and partition
+        """
+        if n_chunks < 1:
+            raise ValueError(f"Invalid number of chunks {n_chunks}! It must be at least 1")
+
+        entries = self.query(run_min, run_max, max_partitions)
+        chunks = [[] for _ in range(n_chunks)]
+
+        if contiguous:
+            total_size = sum(e.size for e in entries)
+            cumulative = 0
+            for e in entries:
+                # Chunk by the byte position of the middle of the file
+                i = min(int((cumulative + e.size / 2) * n_chunks / total_size), n_chunks - 1) if total_size else 0
+                chunks[i].append(e.path)
+                cumulative += e.size
+            return chunks
+
+        heap = [(0, i) for i in range(n_chunks)]
+        order = {e.path: k for k, e in enumerate(entries)}
+        for e in sorted(entries, key=lambda e: e.size, reverse=True):
+            size, i = heapq.heappop(heap)
+            chunks[i].append(e.path)
+            heapq.heappush(heap, (size + e.size, i))
+
+        return [sorted(chunk, key=order.__getitem__) for chunk in chunks]
@@ -1,4 +1,8 @@
-from .converters import *
 from .fileio import *
-from .plotting import *
-from .utils import root_test_objects
+
+try:
+    from .converters import *
+    from .plotting import *
+    from .utils import root_test_objects
+except ImportError:
+    print("Warning: PyROOT is not installed. Only ddfUtils.root.fileio with the uproot backend is available.")
@@ -1,8 +1,19 @@
+import hashlib
+import json
+import os
+import struct
+import zipfile
+from typing import Union
+
+import numpy as np
+import pandas as pd
 import ROOT
 import uproot
-import utils.teff as teff
-import utils.tgraph as tgraph
-import utils.th1 as th1
+
+from ..misc import get_cache_dir
+from .utils import teff
+from .utils import tgraph
+from .utils import th1
 
 
 def to_numpy(obj, **kwargs):
@@ -41,7 +52,191 @@ def to_pandas(obj, **kwargs):
         if obj.GetDimension() > 2:
             raise ValueError("The TEfficiency object is not one or two dimensional!")
         else:
-            return teff.teff_to_numpy(obj, **kwargs)
+            return teff.teff_to_pandas(obj, **kwargs)
 
     else:
-        raise ValueError(f"Type {type(obj)} is cannot be converted to numpy!")
+        raise ValueError(f"Type {type(obj)} is cannot be converted to pandas!")
+
+
+def _save_npz(path: str, arrays: list, columns: Union[list, None] = None):
+    """Write `arrays` uncompressed, so that a hit can memory-map them."""
+    kwargs = {} if columns is None else {"columns": np.array(columns, dtype=str)}
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, *arrays, **kwargs)
+    os.replace(tmp_path, path)
+
+
+def _load_npz(path: str) -> dict:
+    """
+    Memory-map the members of an uncompressed .npz file. Each .npy member is
+    stored as is in the zip, so its data starts at a fixed offset.
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as zf, open(path, "rb") as f:
+        for info in zf.infolist():
+            name = info.filename[:-len(".npy")]
+            f.seek(info.header_offset + 26)
+            name_len, extra_len = struct.unpack("<HH", f.read(4))
+            f.seek(info.header_offset + 30 + name_len + extra_len)
+
+            version = np.lib.format.read_magic(f)
+            if info.compress_type != zipfile.ZIP_STORED or version not in ((1, 0), (2, 0)):
+                arrays[name] = np.load(zf.open(info))
+                continue
+
+            read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+            shape, fortran_order, dtype = read_header(f)
+            if dtype.hasobject or np.prod(shape) == 0:
+                arrays[name] = np.load(zf.open(info))
+            else:
+                arrays[name] = np.memmap(
+                    path, dtype=dtype, mode="r", offset=f.tell(), shape=shape,
+                    order="F" if fortran_order else "C"
+                )
+    return arrays
+
+
+class ConversionCache:
+    """
+    On-disk cache of to_numpy/to_pandas results for objects in ROOT files.
+
+    Entries are keyed by (file path, size, mtime, object path, conversion
+    kwargs), so a rewritten input file is never served from the cache. They
+    are stored as uncompressed .npz files; a hit memory-maps the arrays
+    without opening the ROOT file. When the cache grows beyond `max_bytes`,
+    the least recently used entries are evicted.
+
+    Args:
+        path: Cache directory (default is conversions in get_cache_dir())
+        max_bytes: Maximum total size of the entries
+    """
+
+    def __init__(self, path: Union[str, None] = None, max_bytes: int = 2**30):
+        self.path = os.path.join(get_cache_dir(), "conversions") if path is None else path
+        self.max_bytes = max_bytes
+        os.makedirs(self.path, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+    @property
+    def stats(self) -> dict:
+        entries = self._entries()
+        return {
+            "hits":      self.hits,
+            "misses":    self.misses,
+            "evictions": self.evictions,
+            "entries":   len(entries),
+            "bytes":     sum(size for _, size, _ in entries),
+        }
+
+
+    def _entries(self) -> list:
+        """(path, size, last use) of every entry."""
+        entries = []
+        for entry in os.scandir(self.path):
+            if entry.name.endswith(".npz"):
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((entry.path, st.st_size, st.st_mtime))
+        return entries
+
+
+    def _get_entry_path(self, file_path: str, obj_path: str, kind: str, kwargs: dict) -> str:
+        st = os.stat(file_path)
+        key = json.dumps(
+            [os.path.abspath(file_path), st.st_size, st.st_mtime_ns, obj_path, kind, kwargs],
+            sort_keys=True, default=repr
+        )
+        return os.path.join(self.path, hashlib.sha256(key.encode()).hexdigest() + ".npz")
+
+
+    def _get(self, entry_path: str):
+        try:
+            arrays = _load_npz(entry_path)
+        except (FileNotFoundError, zipfile.BadZipFile):
+            self.misses += 1
+            return None
+
+        # The mtime of an entry is its last use
+        os.utime(entry_path)
+        self.hits += 1
+        return arrays
+
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+    def _convert(self, file_path: str, obj_path: str, convert, kwargs: dict):
+        tfile = ROOT.TFile.Open(file_path)
+        if not tfile or tfile.IsZombie():
+            raise OSError(f"Cannot open '{file_path}'!")
+        try:
+            obj = tfile.Get(obj_path)
+            if not obj:
+                raise KeyError(f"'{obj_path}' not found in '{file_path}'!")
+            return convert(obj, **kwargs)
+        finally:
+            tfile.Close()
+
+
+    def to_numpy(self, file_path: str, obj_path: str, **kwargs) -> tuple:
+        """
+        Cached to_numpy of object `obj_path` in ROOT file `file_path`.
+
+        Returns:
+            tuple: Arrays as returned by to_numpy, memory-mapped on a hit
+        """
+        entry_path = self._get_entry_path(file_path, obj_path, "numpy", kwargs)
+        arrays = self._get(entry_path)
+        if arrays is not None:
+            return tuple(arrays[f"arr_{i}"] for i in range(len(arrays)))
+
+        result = self._convert(file_path, obj_path, to_numpy, kwargs)
+        _save_npz(entry_path, list(result))
+        self._evict()
+        return result
+
+
+    def to_pandas(self, file_path: str, obj_path: str, **kwargs) -> pd.DataFrame:
+        """
+        Cached to_pandas of object `obj_path` in ROOT file `file_path`.
+
+        Returns:
+            pandas.DataFrame: As returned by to_pandas, built from
+                memory-mapped columns on a hit
+        """
+        entry_path = self._get_entry_path(file_path, obj_path, "pandas", kwargs)
+        arrays = self._get(entry_path)
+        if arrays is not None:
+            columns = arrays.pop("columns")
+            return pd.DataFrame({str(c): arrays[f"arr_{i}"] for i, c in enumerate(columns)}, copy=False)
+
+        result = self._convert(file_path, obj_path, to_pandas, kwargs)
+        _save_npz(entry_path, [result[c].to_numpy() for c in result.columns], list(result.columns))
+        self._evict()
+        return result
+
+
+    def clear(self):
+        for path, _, _ in self._entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -1,62 +1,848 @@
+import fnmatch
 import os
-from typing import Iterable, Union
+import queue
+import shutil
+import sys
+import tempfile
+import threading
+import warnings
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Iterable, Iterator, Union
 
-import ROOT
+import numpy as np
+import uproot
+import uproot.writing.identify
+
+
+# ROOT compression settings (100 * algorithm + level). They are ROOT's own
+# kUseAnalysis, kUseGeneralPurpose and kUseSmallest defaults.
+COMPRESSION_PROFILES = {
+    "fast":     404,  # LZ4, level 4
+    "balanced": 505,  # ZSTD, level 5
+    "archive":  207,  # LZMA, level 7
+}
+
+
+def _get_compression(compression: Union[str, int, None]) -> Union[int, None]:
+    """ROOT compression setting of a profile name or setting, None for the file default."""
+    if compression is None or isinstance(compression, int):
+        return compression
+    if compression not in COMPRESSION_PROFILES:
+        raise ValueError(
+            f"Invalid compression profile '{compression}'! "
+            f"Allowed profiles are: {', '.join(COMPRESSION_PROFILES)}"
+        )
+    return COMPRESSION_PROFILES[compression]
+
+
+def _split_dir_path(path: str) -> tuple:
+    return tuple(p for p in str(path).split("/") if p)
+
+
+def _is_root_object(obj) -> bool:
+    # Anything that is a ROOT.TObject has already imported ROOT
+    ROOT = sys.modules.get("ROOT")
+    return ROOT is not None and isinstance(obj, ROOT.TObject)
+
+
+def _is_numpy_hist(obj) -> bool:
+    """(values, edges) or (values, x_edges, y_edges) as accepted by uproot"""
+    return isinstance(obj, tuple) and len(obj) in (2, 3) and all(isinstance(a, np.ndarray) for a in obj)
+
+
+def _is_uproot_writable(obj) -> bool:
+    return _is_root_object(obj) or isinstance(obj, uproot.Model) or _is_numpy_hist(obj)
+
+
+def _iter_objects(
+    obj,
+    path:      tuple,
+    nested:    bool,
+    is_object: Callable,
+    key:       Union[str, None] = None
+) -> Iterator[tuple]:
+    """
+    Flatten the nested input of save_to_root into (directory path, key,
+    object) triplets, where `key` is the innermost dict key above the object.
+    With `nested`, every dict key also yields (path, key, None) so that empty
+    dicts still create their directory.
+    """
+    if is_object(obj):
+        yield path, key, obj
+
+    elif isinstance(obj, dict):
+        for sub_key, sub_obj in obj.items():
+            sub_path = path + _split_dir_path(sub_key) if nested else path
+            if nested:
+                yield sub_path, str(sub_key), None
+            yield from _iter_objects(sub_obj, sub_path, nested, is_object, str(sub_key))
+
+    elif isinstance(obj, Iterable) and not isinstance(obj, (str, bytes)):
+        for sub_obj in obj:
+            yield from _iter_objects(sub_obj, path, nested, is_object, key)
+
+    else:
+        raise ValueError(f"Unsupported object type: {type(obj)}")
+
+
+def _group_by_dir(objects: tuple, directory: str, nested: bool, is_object: Callable) -> dict:
+    """{directory path: [(key, object)]} in the order the directories are first seen."""
+    top = _split_dir_path(directory)
+    groups = {top: []}
+    for obj in objects:
+        for path, key, sub_obj in _iter_objects(obj, top, nested, is_object):
+            group = groups.setdefault(path, [])
+            if sub_obj is not None:
+                group.append((key, sub_obj))
+    return groups
+
+
+class _TDirectoryCache:
+    """Resolve directory paths below a TDirectory once, creating them as needed."""
+
+    def __init__(self, top: "ROOT.TDirectory"):
+        self._dirs = {(): top}
+
+
+    def __iter__(self):
+        return iter(self._dirs.values())
+
+
+    def get(self, path: tuple) -> "ROOT.TDirectory":
+        tdir = self._dirs.get(path)
+        if tdir is None:
+            parent = self.get(path[:-1])
+            tdir = parent.GetDirectory(path[-1]) or parent.mkdir(path[-1])
+            self._dirs[path] = tdir
+        return tdir
+
+
+def _open_tfile(fout: str, overwrite: bool, compression: Union[int, None] = None) -> "ROOT.TFile":
+    import ROOT
+
+    mode = "recreate" if overwrite or not os.path.exists(fout) else "update"
+    tfile = ROOT.TFile(fout, mode)
+    if not tfile or tfile.IsZombie():
+        raise OSError(f"Cannot open '{fout}' in {mode} mode!")
+    if compression is not None:
+        tfile.SetCompressionSettings(compression)
+    return tfile
+
+
+def _write_root_groups(dirs: _TDirectoryCache, groups: dict):
+    for path, dir_objects in groups.items():
+        tdir = dirs.get(path)
+        if dir_objects:
+            tdir.cd()
+            for _, obj in dir_objects:
+                obj.Write()
+
+
+def _flush_tfile(fout: "ROOT.TFile", dirs: _TDirectoryCache):
+    """Save the key lists of the touched directories, leaving the file open."""
+    for tdir in dirs:
+        tdir.SaveSelf(True)
+    fout.Flush()
+
+
+def _save_with_root(
+    groups:         dict,
+    fout:           Union["ROOT.TFile", str],
+    print_filename: bool,
+    overwrite:      bool,
+    compression:    Union[int, None]
+):
+    owned = isinstance(fout, str)
+    if owned:
+        fout = _open_tfile(fout, overwrite, compression)
+    elif compression is not None:
+        previous_compression = fout.GetCompressionSettings()
+        fout.SetCompressionSettings(compression)
+
+    dirs = _TDirectoryCache(fout)
+    try:
+        _write_root_groups(dirs, groups)
+
+        if print_filename:
+            print(f"Output file: {fout.GetName()}")
+
+    finally:
+        if owned:
+            fout.Close()
+        else:
+            _flush_tfile(fout, dirs)
+            if compression is not None:
+                fout.SetCompressionSettings(previous_compression)
+            fout.cd()
+
+
+def _get_uproot_axis(axis: "ROOT.TAxis", name: str, edges: np.ndarray):
+    return uproot.writing.identify.to_TAxis(
+        fName=name, fTitle=axis.GetTitle(),
+        fNbins=len(edges) - 1, fXmin=edges[0], fXmax=edges[-1], fXbins=edges
+    )
+
+
+def _tarray_to_numpy(tarray: "ROOT.TArrayD") -> np.ndarray:
+    size = tarray.GetSize()
+    if size == 0:
+        return np.zeros(0)
+    return np.frombuffer(tarray.GetArray(), dtype=np.float64, count=size).copy()
+
+
+# TProfile::GetErrorOption() -> EErrorType
+_PROFILE_ERROR_MODES = {"": 0, "s": 1, "i": 2, "g": 3}
+
+
+def _root_profile_to_uproot(profile: "ROOT.TProfile"):
+    """Copy a ROOT TProfile, including under- and overflow, to a writable uproot TProfile."""
+    edges = np.array([profile.GetXaxis().GetBinLowEdge(i) for i in range(1, profile.GetNbinsX() + 2)])
+    stats = np.zeros(6)
+    profile.GetStats(stats)
+
+    return uproot.writing.identify.to_TProfile(
+        fName=profile.GetName(), fTitle=profile.GetTitle(), data=_tarray_to_numpy(profile),
+        fEntries=profile.GetEntries(), fTsumw=stats[0], fTsumw2=stats[1],
+        fTsumwx=stats[2], fTsumwx2=stats[3], fTsumwy=stats[4], fTsumwy2=stats[5],
+        fSumw2=_tarray_to_numpy(profile.GetSumw2()),
+        fBinEntries=np.array([profile.GetBinEntries(i) for i in range(profile.GetNbinsX() + 2)]),
+        fBinSumw2=_tarray_to_numpy(profile.GetBinSumw2()),
+        fXaxis=_get_uproot_axis(profile.GetXaxis(), "xaxis", edges),
+        fYmin=profile.GetYmin(), fYmax=profile.GetYmax(),
+        fErrorMode=_PROFILE_ERROR_MODES.get(profile.GetErrorOption().lower(), 0)
+    )
+
+
+def _root_hist_to_uproot(hist: "ROOT.TH1"):
+    """
+    Convert a ROOT TH1 or TH2 to a writable uproot TH1D/TH2D through
+    converters.to_numpy, or a TProfile to an uproot TProfile.
+
+    Histograms of any precision (TH1F, TH2I, ...) come out as TH1D/TH2D and
+    their under- and overflow bins are dropped; the statistics (sum of
+    weights, mean, standard deviation) are copied from the ROOT object.
+    Profiles keep their under- and overflow bins.
+    """
+    from . import converters
+
+    if hist.InheritsFrom("TProfile"):
+        return _root_profile_to_uproot(hist)
+
+    dim = hist.GetDimension() if hist.InheritsFrom("TH1") else 0
+    if dim not in (1, 2) or hist.InheritsFrom("TProfile2D"):
+        raise ValueError(f"Type {type(hist)} cannot be written with the uproot backend!")
+
+    # sumw, sumw2, sumwx, sumwx2 and, for 2D, sumwy, sumwy2, sumwxy
+    stats = np.zeros(7)
+    hist.GetStats(stats)
+
+    if dim == 1:
+        _, y, edges, _, ey = converters.to_numpy(hist)
+        data, sumw2 = np.zeros(len(y) + 2), np.zeros(len(y) + 2)
+        data[1:-1], sumw2[1:-1] = y, ey**2
+
+        return uproot.writing.identify.to_TH1x(
+            fName=hist.GetName(), fTitle=hist.GetTitle(), data=data,
+            fEntries=hist.GetEntries(), fTsumw=stats[0], fTsumw2=stats[1],
+            fTsumwx=stats[2], fTsumwx2=stats[3], fSumw2=sumw2,
+            fXaxis=_get_uproot_axis(hist.GetXaxis(), "xaxis", edges)
+        )
+
+    x, y, values, x_edges, y_edges, _, _, ez = converters.to_numpy(hist)
+    data, sumw2 = np.zeros((len(y) + 2, len(x) + 2)), np.zeros((len(y) + 2, len(x) + 2))
+    data[1:-1, 1:-1], sumw2[1:-1, 1:-1] = values, ez**2
+
+    return uproot.writing.identify.to_TH2x(
+        fName=hist.GetName(), fTitle=hist.GetTitle(), data=data.ravel(),
+        fEntries=hist.GetEntries(), fTsumw=stats[0], fTsumw2=stats[1],
+        fTsumwx=stats[2], fTsumwx2=stats[3], fTsumwy=stats[4], fTsumwy2=stats[5],
+        fTsumwxy=stats[6], fSumw2=sumw2.ravel(),
+        fXaxis=_get_uproot_axis(hist.GetXaxis(), "xaxis", x_edges),
+        fYaxis=_get_uproot_axis(hist.GetYaxis(), "yaxis", y_edges)
+    )
+
+
+def _to_uproot(key: Union[str, None], obj) -> tuple:
+    """(name, object uproot can write) for one object of the uproot backend."""
+    if _is_root_object(obj):
+        return obj.GetName(), _root_hist_to_uproot(obj)
+
+    if isinstance(obj, uproot.Model) and obj.has_member("fName"):
+        return obj.member("fName"), obj
+
+    if key is None:
+        raise ValueError("Objects without a name, such as (values, edges) tuples, must be dict values, whose key is used as name!")
+    return key, obj
+
+
+def _open_uproot_file(fout: str, overwrite: bool, compression: Union[int, None] = None) -> uproot.WritableDirectory:
+    file = uproot.recreate(fout) if overwrite or not os.path.exists(fout) else uproot.update(fout)
+    if compression is not None:
+        file.compression = uproot.compression.Compression.from_code(compression)
+    return file
+
+
+def _to_uproot_groups(groups: dict) -> dict:
+    """
+    Name and convert the objects of every group for uproot, so that an
+    unsupported object fails before the file is opened.
+    """
+    return {path: [_to_uproot(key, obj) for key, obj in dir_objects] for path, dir_objects in groups.items()}
+
+
+def _write_uproot_groups(fout: uproot.WritableDirectory, groups: dict):
+    """Write groups converted by _to_uproot_groups."""
+    for path, dir_objects in groups.items():
+        tdir = fout.mkdir("/".join(path)) if path else fout
+        if dir_objects:
+            tdir.update(dir_objects)
+
+
+def _save_with_uproot(
+    groups:         dict,
+    fout:           Union[uproot.WritableDirectory, str],
+    print_filename: bool,
+    overwrite:      bool,
+    compression:    Union[int, None]
+):
+    owned = isinstance(fout, str)
+    if owned:
+        fout = _open_uproot_file(fout, overwrite, compression)
+    elif compression is not None:
+        previous_compression = fout.compression
+        fout.compression = uproot.compression.Compression.from_code(compression)
+
+    try:
+        _write_uproot_groups(fout, groups)
+
+        if print_filename:
+            print(f"Output file: {fout.file_path}")
+
+    finally:
+        if owned:
+            fout.close()
+        elif compression is not None:
+            fout.compression = previous_compression
 
 
 def save_to_root(
     *objects,
-    fout: Union[ROOT.TFile, str],
+    fout: Union["ROOT.TFile", uproot.WritableDirectory, str],
     directory: str = "",
     print_filename: bool = True,
     nested: bool = False,
-    overwrite: bool = False
+    overwrite: bool = False,
+    backend: str = "root",
+    compression: Union[str, int, None] = None
 ):
-    if isinstance(fout, str):
-        if overwrite:
-            fout = ROOT.TFile(fout, "recreate")
+    """
+    Write ROOT objects, possibly in (nested) dicts and iterables, to a file.
+
+    The input is first grouped by output directory, every directory is
+    resolved (or created) once, and its objects are written one after the
+    other. A file given by path is closed afterwards; an open TFile has the
+    key lists of the touched directories saved and stays open.
+
+    The 'uproot' backend writes the same layout with uproot.recreate/update
+    and does not need PyROOT. It also accepts uproot models and NumPy
+    (values, edges) or (values, x_edges, y_edges) tuples, which are named
+    after their dict key. ROOT TH1/TH2 are converted with converters.to_numpy
+    and written as TH1D/TH2D without their under- and overflow bins (their
+    statistics are kept), and TProfiles are copied; other ROOT classes are
+    not supported. All objects are converted before the file is opened,
+    so an unsupported object leaves an existing file untouched.
+
+    Args:
+        *objects: ROOT objects, dicts or iterables of them
+        fout: Output TFile, uproot file or directory, or path
+        directory: Directory in the file to write into
+        print_filename: Print the name of the output file
+        nested: Write dict values into subdirectories named after their keys
+        overwrite: Recreate the file if `fout` is a path to an existing file
+        backend: 'root' or 'uproot'; an uproot `fout` implies 'uproot'
+        compression: Profile from COMPRESSION_PROFILES ('fast', 'balanced',
+            'archive'), ROOT compression setting (100 * algorithm + level) or
+            None for the file's current setting. An open file gets its
+            setting back afterwards.
+
+    Raises:
+        ValueError: If the backend or the type of an object is not supported
+    """
+    if isinstance(fout, uproot.WritableDirectory):
+        backend = "uproot"
+    compression = _get_compression(compression)
+
+    if backend == "root":
+        groups = _group_by_dir(objects, directory, nested, _is_root_object)
+        _save_with_root(groups, fout, print_filename, overwrite, compression)
+
+    elif backend == "uproot":
+        groups = _to_uproot_groups(_group_by_dir(objects, directory, nested, _is_uproot_writable))
+        _save_with_uproot(groups, fout, print_filename, overwrite, compression)
+
+    else:
+        raise ValueError(f"Invalid backend '{backend}'! Allowed backends are: root, uproot")
+
+
+class RootWriter:
+    """
+    Write objects to a ROOT file on a background I/O thread.
+
+    write() groups the objects by directory like save_to_root and puts them
+    on a queue of at most `max_queued` batches; the I/O thread opens the
+    file, serializes, compresses and writes them, so the caller only blocks
+    when the queue is full. The objects must not be modified after being
+    passed to write() (pass a Clone() if they are still filled).
+
+    An error on the I/O thread stops all further writes and is raised by
+    the next write(), flush() or close(). close() writes everything still
+    queued and closes the file; it is called on leaving a with block.
+
+    PyROOT holds the GIL during each Write() call, so with the 'root'
+    backend the caller runs in between objects; the overlap is largest when
+    the caller spends its time in NumPy or compiled code.
+
+    Args:
+        fout: Path of the output file
+        directory: Directory in the file to write into
+        nested: Write dict values into subdirectories named after their keys
+        overwrite: Recreate the file if it exists
+        backend: 'root' or 'uproot', see save_to_root
+        compression: Compression profile or setting, see save_to_root
+        max_queued: Maximum number of write() batches waiting on the queue
+        print_filename: Print the name of the output file on close()
+
+    Example:
+        with RootWriter("out.root", nested=True) as writer:
+            for run in runs:
+                writer.write({run: analyse(run)})
+    """
+
+    def __init__(
+        self,
+        fout:           str,
+        directory:      str  = "",
+        nested:         bool = False,
+        overwrite:      bool = False,
+        backend:        str  = "root",
+        compression:    Union[str, int, None] = None,
+        max_queued:     int  = 16,
+        print_filename: bool = True
+    ):
+        if backend == "root":
+            import ROOT
+
+            # Keeps gDirectory of the I/O thread apart from the caller's
+            ROOT.EnableThreadSafety()
+            self._is_object = _is_root_object
+        elif backend == "uproot":
+            self._is_object = _is_uproot_writable
         else:
-            if os.path.exists(fout):
-                fout = ROOT.TFile(fout, "update")
-            else:
-                fout = ROOT.TFile(fout, "recreate")
+            raise ValueError(f"Invalid backend '{backend}'! Allowed backends are: root, uproot")
+
+        self.fout           = fout
+        self.directory      = directory
+        self.nested         = nested
+        self.overwrite      = overwrite
+        self.backend        = backend
+        self.compression    = _get_compression(compression)
+        self.print_filename = print_filename
+
+        self._queue  = queue.Queue(maxsize=max_queued)
+        self._error  = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="RootWriter", daemon=True)
+        self._thread.start()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            # Do not mask the original exception
+            try:
+                self.close()
+            except Exception:
+                pass
+
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise RuntimeError(f"RootWriter failed writing to '{self.fout}'!") from self._error
+
+
+    def write(self, *objects):
+        """Queue ROOT objects, possibly in (nested) dicts and iterables, for writing."""
+        if self._closed:
+            raise ValueError("RootWriter is closed!")
+        self._raise_error()
+
+        groups = _group_by_dir(objects, self.directory, self.nested, self._is_object)
+        if self.backend == "uproot":
+            groups = _to_uproot_groups(groups)
+        self._queue.put(("write", groups))
+
+
+    def flush(self):
+        """Wait until everything queued is written and saved to disk."""
+        if self._closed:
+            raise ValueError("RootWriter is closed!")
 
+        done = threading.Event()
+        self._queue.put(("flush", done))
+        done.wait()
+        self._raise_error()
 
 
-    def recursive_save(obj, current_dir, path=""):
-        if isinstance(obj, ROOT.TObject):
-            current_dir.cd()
-            obj.Write()
+    def close(self):
+        """Write everything queued, close the file and stop the I/O thread."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(("close", None))
+            self._thread.join()
+        self._raise_error()
 
-        elif isinstance(obj, dict):
-            for sub_key, sub_obj in obj.items():
-                if not nested:
-                    recursive_save(sub_obj, current_dir, path)
+
+    def _run(self):
+        fout = dirs = None
+        try:
+            if self.backend == "root":
+                fout = _open_tfile(self.fout, self.overwrite, self.compression)
+                dirs = _TDirectoryCache(fout)
+            else:
+                fout = _open_uproot_file(self.fout, self.overwrite, self.compression)
+        except BaseException as e:
+            self._error = e
+
+        # After an error the queue is still drained, so that callers never block
+        while True:
+            command, item = self._queue.get()
+            try:
+                if self._error is None:
+                    if command == "write" and self.backend == "root":
+                        _write_root_groups(dirs, item)
+                    elif command == "write":
+                        _write_uproot_groups(fout, item)
+                    elif command == "flush" and self.backend == "root":
+                        _flush_tfile(fout, dirs)
+                    elif command == "flush":
+                        fout.file.sink.flush()
+            except BaseException as e:
+                self._error = e
+            finally:
+                if command == "flush":
+                    item.set()
+
+            if command == "close":
+                break
+
+        if fout is not None:
+            try:
+                if self.backend == "root":
+                    fout.Close()
                 else:
-                    sub_key_str = str(sub_key)
-                    sub_dir_path = f"{path}/{sub_key_str}" if path else sub_key_str
+                    fout.close()
+            except BaseException as e:
+                if self._error is None:
+                    self._error = e
+
+        if self.print_filename and self._error is None:
+            print(f"Output file: {self.fout}")
+
+
+def _read_key(key: "ROOT.TKey"):
+    """Read an object that is owned by Python, not by its directory."""
+    import ROOT
+
+    obj = key.ReadObj()
+    if hasattr(obj, "SetDirectory"):
+        obj.SetDirectory(ROOT.nullptr)
+    ROOT.SetOwnership(obj, True)
+    return obj
+
+
+def _merge_dirs(in_dirs: list, out_dir: "ROOT.TDirectory"):
+    """
+    Merge the objects of `in_dirs` key by key into `out_dir` and recurse
+    into subdirectories. Only the objects of one key are in memory at once.
+    """
+    import ROOT
 
-                    if not current_dir.GetDirectory(sub_key_str):
-                        current_dir.mkdir(sub_key_str)
+    names = {}
+    for in_dir in in_dirs:
+        for key in in_dir.GetListOfKeys():
+            names.setdefault(key.GetName(), []).append(in_dir)
 
-                    sub_dir = current_dir.GetDirectory(sub_key_str)
-                    recursive_save(sub_obj, sub_dir, sub_dir_path)
+    for name, dirs in names.items():
+        # GetKey returns the highest cycle, older cycles are not merged
+        dir_keys = [(d, d.GetKey(name)) for d in dict.fromkeys(dirs)]
+        class_names = {k.GetClassName() for _, k in dir_keys}
+        if len(class_names) > 1:
+            raise ValueError(f"'{out_dir.GetPath()}/{name}' has different classes in the inputs: {', '.join(sorted(class_names))}!")
 
-        elif isinstance(obj, Iterable) and not isinstance(obj, (str, bytes)):
-            for sub_obj in obj:
-                recursive_save(sub_obj, current_dir, path)
+        cls = ROOT.TClass.GetClass(dir_keys[0][1].GetClassName())
+        if not cls:
+            raise ValueError(f"Unknown class '{dir_keys[0][1].GetClassName()}' of '{out_dir.GetPath()}/{name}'!")
+
+        if cls.InheritsFrom("TDirectory"):
+            sub_dir = out_dir.GetDirectory(name) or out_dir.mkdir(name)
+            _merge_dirs([d.GetDirectory(name) for d, _ in dir_keys], sub_dir)
+
+        elif cls.InheritsFrom("TTree"):
+            warnings.warn(f"Skipping TTree '{out_dir.GetPath()}/{name}', trees are not merged")
 
         else:
-            raise ValueError(f"Unsupported object type: {type(obj)}")
+            objects = [_read_key(k) for _, k in dir_keys]
+            merged = objects[0]
+            if len(objects) > 1 and hasattr(merged, "Merge"):
+                others = ROOT.TList()
+                try:
+                    for obj in objects[1:]:
+                        others.Add(obj)
+                    merged.Merge(others)
+                finally:
+                    # The objects are owned by Python, the list must not outlive them
+                    others.Clear("nodelete")
+            out_dir.WriteTObject(merged, name)
+            del objects, merged
 
-    if not fout.GetDirectory(directory) and directory:
-        fout.mkdir(directory)
 
-    current_dir = fout.GetDirectory(directory) if directory else fout
-    for obj in objects:
-        recursive_save(obj, current_dir)
+def _merge_files(inputs: list, output: str, compression: Union[int, None] = None) -> str:
+    import ROOT
+
+    in_files = []
+    out_file = None
+    try:
+        for path in inputs:
+            in_file = ROOT.TFile.Open(path)
+            if not in_file or in_file.IsZombie():
+                raise OSError(f"Cannot open '{path}'!")
+            in_files.append(in_file)
+
+        out_file = _open_tfile(output, True, compression)
+        _merge_dirs(in_files, out_file)
+    finally:
+        if out_file is not None:
+            out_file.Close()
+        for in_file in in_files:
+            in_file.Close()
+    return output
+
+
+def merge_root_files(
+    inputs:         Iterable[str],
+    output:         str,
+    n_workers:      Union[int, None] = None,
+    fan_in:         int  = 2,
+    overwrite:      bool = False,
+    compression:    Union[str, int, None] = None,
+    print_filename: bool = True
+) -> str:
+    """
+    Merge ROOT files object by object like hadd, following the nested layout
+    written by save_to_root.
+
+    Every object is combined with its class's Merge method, as in hadd:
+    histograms are added, TEfficiency pass/total histograms are added and
+    graphs get the points of the others appended. Objects without a Merge
+    method are taken from the first file that has them; trees are skipped.
+
+    The files are reduced in a tree: each level merges groups of `fan_in`
+    files in parallel over `n_workers` processes (None uses every CPU) into
+    temporary files next to `output`. Every merge walks the files one
+    directory and one key at a time, so memory scales with the largest
+    object and not with the file set.
+
+    Args:
+        inputs: Paths of the files to merge
+        output: Path of the merged file
+        n_workers: Number of worker processes
+        fan_in: Number of files merged per task
+        overwrite: Replace `output` if it exists
+        compression: Compression profile or setting of the merged file, see
+            save_to_root (intermediate files always use 'fast')
+        print_filename: Print the name of the output file
+
+    Returns:
+        str: `output`
+    """
+    inputs = list(inputs)
+    compression = _get_compression(compression)
+    if not inputs:
+        raise ValueError("No input files to merge!")
+    if fan_in < 2:
+        raise ValueError(f"Invalid fan_in {fan_in}! It must be at least 2")
+    if os.path.exists(output) and not overwrite:
+        raise ValueError(f"Output file '{output}' exists! Use overwrite=True to replace it")
+
+    tmp_dir = tempfile.mkdtemp(prefix=".merge_", dir=os.path.dirname(os.path.abspath(output)))
+    executor = ProcessPoolExecutor(max_workers=n_workers) if n_workers != 1 else None
+    try:
+        level = 0
+        while len(inputs) > 1 or level == 0:
+            groups = [inputs[i:i + fan_in] for i in range(0, len(inputs), fan_in)]
+            outputs = [os.path.join(tmp_dir, f"level{level}_{i}.root") for i in range(len(groups))]
+            level_compression = compression if len(groups) == 1 else COMPRESSION_PROFILES["fast"]
+            compressions = [level_compression] * len(groups)
+
+            if executor is None:
+                merged = list(map(_merge_files, groups, outputs, compressions))
+            else:
+                merged = list(executor.map(_merge_files, groups, outputs, compressions))
+
+            # Intermediate files of the previous level are no longer needed
+            for path in inputs:
+                if os.path.dirname(path) == tmp_dir:
+                    os.remove(path)
+            inputs = merged
+            level += 1
+
+        os.replace(inputs[0], output)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
 
     if print_filename:
-        print(f"Output file: {fout.GetName()}")
+        print(f"Output file: {output}")
+    return output
+
+
+class _LazyObject:
+    """An object or directory in an open uproot file, read by load()."""
+    __slots__ = ("_file", "_path", "classname")
+
+    def __init__(self, file: uproot.ReadOnlyDirectory, path: str, classname: str):
+        self._file = file
+        self._path = path
+        self.classname = classname
+
+
+    def load(self):
+        if self.classname == "TDirectory":
+            return _list_lazy(self._file, self._path)
+        return self._file[self._path]
+
+
+class LazyDict(Mapping):
+    """
+    Read-only mapping from load_from_root whose values are read from their
+    file on first access and kept afterwards.
+    """
+
+    def __init__(self, data: dict):
+        self._data = data
+
+
+    def __getitem__(self, key):
+        value = self._data[key]
+        if isinstance(value, _LazyObject):
+            value = self._data[key] = value.load()
+        return value
+
+
+    def __iter__(self):
+        return iter(self._data)
+
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+    def __repr__(self) -> str:
+        items = ", ".join(
+            f"{key!r}: <{value.classname}>" if isinstance(value, _LazyObject) else f"{key!r}: {value!r}"
+            for key, value in self._data.items()
+        )
+        return f"LazyDict({{{items}}})"
+
+
+    def is_loaded(self, key) -> bool:
+        return not isinstance(self._data[key], _LazyObject)
+
+
+def _list_lazy(file: uproot.ReadOnlyDirectory, path: str) -> LazyDict:
+    """LazyDict of one directory, whose subdirectories are listed on access."""
+    directory = file[path] if path else file
+    return LazyDict({
+        name: _LazyObject(file, f"{path}/{name}" if path else name, classname)
+        for name, classname in directory.classnames(recursive=False, cycle=False).items()
+    })
+
+
+def _to_lazy_dict(tree: dict) -> LazyDict:
+    return LazyDict({k: _to_lazy_dict(v) if isinstance(v, dict) else v for k, v in tree.items()})
+
+
+def _load_file(path: str, pattern: str, nested: bool, lazy: bool) -> Union[dict, LazyDict]:
+    file = uproot.open(path)
+
+    # Without a pattern even the directories can be listed on demand
+    if lazy and nested and pattern == "*":
+        return _list_lazy(file, "")
+
+    tree = {}
+    for obj_path, classname in file.classnames(recursive=True, cycle=False).items():
+        if classname == "TDirectory" or not fnmatch.fnmatchcase(obj_path, pattern):
+            continue
+
+        value = _LazyObject(file, obj_path, classname) if lazy else file[obj_path]
+        if nested:
+            *dirs, name = obj_path.split("/")
+            sub_tree = tree
+            for d in dirs:
+                sub_tree = sub_tree.setdefault(d, {})
+            sub_tree[name] = value
+        else:
+            tree[obj_path] = value
+
+    if lazy:
+        return _to_lazy_dict(tree)
+
+    file.close()
+    return tree
+
+
+def load_from_root(
+    paths:       Union[str, Iterable[str]],
+    pattern:     str  = "*",
+    nested:      bool = True,
+    lazy:        bool = True,
+    max_workers: int  = 8
+) -> Union[dict, LazyDict]:
+    """
+    Read the objects of ROOT files with uproot into dicts, the counterpart
+    of save_to_root.
+
+    The files are opened and listed concurrently in a thread pool. With
+    `lazy`, every object is deserialized when it is first looked up in its
+    LazyDict, and without a `pattern` (nested) directories are only listed
+    when first looked up as well. The files stay open as long as the dicts
+    are referenced. Objects that uproot cannot deserialize (such as
+    TEfficiency written by recent ROOT versions) raise when they are read.
+
+    Args:
+        paths: Path of a file or iterable of paths
+        pattern: fnmatch pattern on the object paths in the file, e.g. "run_*/h_*"
+        nested: Nested dicts following the directories; otherwise one dict
+            keyed by the full object path
+        lazy: Return LazyDicts instead of reading every object
+        max_workers: Number of threads
+
+    Returns:
+        dict or LazyDict: Objects of the file, or {path: objects} for several files
+    """
+    single = isinstance(paths, str)
+    paths = [paths] if single else list(paths)
+
+    load = partial(_load_file, pattern=pattern, nested=nested, lazy=lazy)
+    with ThreadPoolExecutor(max_workers=min(max_workers, max(1, len(paths)))) as executor:
+        trees = list(executor.map(load, paths))
 
-    fout.cd()
+    return trees[0] if single else dict(zip(paths, trees))
@@ -1,8 +1,9 @@
-import converters
 import matplotlib.pyplot as plt
 import pandas as pd
 import ROOT
 
+from . import converters
+
 
 def errplot(obj,
     cols: dict = {
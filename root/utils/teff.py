@@ -48,7 +48,7 @@ def set_stat_option(
         teff.SetStatisticOption(ROOT.TEfficiency.kBBayesian)
     elif stat_option in wilson_options:
         teff.SetStatisticOption(ROOT.TEfficiency.kFWilson)
-    elif feldman_cousings_options:
+    elif stat_option in feldman_cousings_options:
         teff.SetStatisticOption(ROOT.TEfficiency.kFFC)
     elif stat_option in agresti_coull_options:
         teff.SetStatisticOption(ROOT.TEfficiency.kFAC)
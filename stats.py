@@ -1,82 +1,555 @@
-from typing import Union
+import os
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from typing import Callable, Union
 
 import numpy as np
+import pandas as pd
 from scipy.optimize import root_scalar
+from scipy.special import betaln, gammaln, xlog1py, xlogy
 from scipy.stats import beta, norm
 
+from .misc import get_cache_dir
+
+
+NORMAL_OPTIONS          = {"normal", "kfnormal"}
+CLOPPER_PEARSON_OPTIONS = {"clopper_pearson", "kfcp", "clopper pearson",
+                           "clopper-pearson", "clopper.pearson",
+                           "clopper:pearson", "clopperpearson"}
+BAYESIAN_OPTIONS        = {"bayesian", "kbbayesian"}
+WILSON_OPTIONS          = {"wilson", "kfwilson"}
+FELDMAN_COUSINS_OPTIONS = {"feldman_cousins", "kffc",
+                           "feldman cousins", "feldman-cousings",
+                           "feldman:cousins", "feldman.cousins",
+                           "feldmancousins"}
+AGRESTI_COULL_OPTIONS   = {"agresti_coull", "kfac",
+                           "agresti coull", "agresti-coull",
+                           "agresti:coull", "agresti.coull",
+                           "agresticoull"}
+MID_P_INTERVAL_OPTIONS  = {"mid_p_interval", "kmidp",
+                           "mid p interval", "mid-p-interval",
+                           "mid:p:interval", "mid.p.interval",
+                           "midpinterval"}
+JEFFREY_OPTIONS         = {"jeffrey", "kbjeffrey"}
+UNIFORM_PRIOR_OPTIONS   = {"uniform_prior", "kbuniform",
+                           "uniform prior", "uniform-prior",
+                           "uniform:prior", "uniform.prior",
+                           "uniformprior"}
+
+_STAT_OPTIONS = {
+    "normal":          NORMAL_OPTIONS,
+    "clopper_pearson": CLOPPER_PEARSON_OPTIONS,
+    "bayesian":        BAYESIAN_OPTIONS,
+    "wilson":          WILSON_OPTIONS,
+    "feldman_cousins": FELDMAN_COUSINS_OPTIONS,
+    "agresti_coull":   AGRESTI_COULL_OPTIONS,
+    "mid_p_interval":  MID_P_INTERVAL_OPTIONS,
+    "jeffrey":         JEFFREY_OPTIONS,
+    "uniform_prior":   UNIFORM_PRIOR_OPTIONS,
+}
+
+
+def _resolve_stat_option(stat_option: str) -> str:
+    """Map any accepted alias to its canonical option name."""
+    stat_option = stat_option.lower()
+
+    for name, options in _STAT_OPTIONS.items():
+        if stat_option in options:
+            return name
+
+    allowed_options = set().union(*_STAT_OPTIONS.values())
+    raise ValueError(f"Invalid statistic option '{stat_option}'! Allowed options are: {', '.join(allowed_options)}")
+
+
+def _as_counts(passed, total):
+    """Broadcast `passed` and `total` to float arrays of a common shape."""
+    passed, total = np.broadcast_arrays(
+        np.asarray(passed, dtype=np.float64),
+        np.asarray(total,  dtype=np.float64)
+    )
+    return passed, total
+
+
+def _get_efficiency(passed: np.ndarray, total: np.ndarray) -> np.ndarray:
+    """Return passed/total, with 0 wherever total is 0."""
+    has_total = total > 0
+    return np.where(has_total, passed / np.where(has_total, total, 1.), 0.)
+
+
+def _as_output(efficiency, upper_bound, lower_bound, return_bounds: bool  = False) -> tuple:
+    """Turn bounds into (efficiency, upper error, lower error), unwrapping 0-d arrays."""
+    if return_bounds:
+        return efficiency[()], np.asarray(upper_bound)[()], np.asarray(lower_bound)[()]
+
+    deff_up  = np.abs(efficiency - upper_bound)
+    deff_low = np.abs(efficiency - lower_bound)
+
+    return efficiency[()], deff_up[()], deff_low[()]
+
 
 def get_clopper_pearson_interval(
-    passed: int,
-    total: int,
-    cl: float = 0.6826894921370859
+    passed:        Union[int, np.ndarray],
+    total:         Union[int, np.ndarray],
+    cl:            float = 0.6826894921370859,
+    return_bounds: bool  = False
 ) -> tuple:
     """
     Calculate Clopper-Pearson confidence interval for binomial proportion.
 
+    Accepts scalars or arrays of any (broadcastable) shape. Bins with
+    passed == 0, passed == total or total == 0 get the limits 0 and/or 1
+    directly instead of evaluating beta.ppf with a degenerate shape.
+
     Args:
         passed: Number of successes
         total: Total number of trials
         cl: Confidence level (default is 1-sigma)
+        return_bounds: Return the lower and upper bounds in place of the errors
 
     Returns:
-        tuple: (efficiency, upper error, lower error)
+        tuple: (efficiency, upper error, lower error), or
+        (efficiency, upper bound, lower bound) if `return_bounds` is set
     """
-    efficiency = passed/total
+    passed, total = _as_counts(passed, total)
+    efficiency = _get_efficiency(passed, total)
 
-    alpha = 1 - cl
-    lower_bound = beta.ppf(alpha / 2, passed, total - passed + 1)
-    upper_bound = beta.ppf(1 - alpha / 2, passed + 1, total - passed)
+    alpha  = 1 - cl
+    failed = total - passed
+    has_lower = passed > 0
+    has_upper = failed > 0
+
+    lower_bound = np.where(
+        has_lower,
+        beta.ppf(alpha / 2, np.where(has_lower, passed, 1.), failed + 1),
+        0.
+    )
+    upper_bound = np.where(
+        has_upper,
+        beta.ppf(1 - alpha / 2, passed + 1, np.where(has_upper, failed, 1.)),
+        1.
+    )
 
-    return efficiency, abs(efficiency - upper_bound), abs(efficiency - lower_bound)
+    return _as_output(efficiency, upper_bound, lower_bound, return_bounds)
 
 
 
 
 def get_bayesian_interval(
-    passed:      Union[float, int],
-    total:       Union[float, int],
-    alpha_prior: float = 1,
-    beta_prior:  float = 1,
-    cl:          float = 0.6826894921370859
+    passed:        Union[float, int, np.ndarray],
+    total:         Union[float, int, np.ndarray],
+    alpha_prior:   float = 1,
+    beta_prior:    float = 1,
+    cl:            float = 0.6826894921370859,
+    return_bounds: bool  = False
 ) -> tuple:
     """
     Calculate Bayesian confidence interval for binomial proportion.
 
+    Accepts scalars or arrays of any (broadcastable) shape.
+
     Args:
         passed: Number of successes
         total: Total number of trials
         alpha_prior: Prior alpha parameter for beta distribution
         beta_prior: Prior beta parameter for beta distribution
         cl: Confidence level (default is 1-sigma)
+        return_bounds: Return the lower and upper bounds in place of the errors
 
     Returns:
-        tuple: (efficiency, upper error, lower error)
+        tuple: (efficiency, upper error, lower error), or
+        (efficiency, upper bound, lower bound) if `return_bounds` is set
     """
+    passed, total = _as_counts(passed, total)
+
     alpha_post = alpha_prior + passed
     beta_post = beta_prior + total - passed
 
     lower_bound = beta.ppf((1 - cl) / 2, alpha_post, beta_post)
     upper_bound = beta.ppf(1 - (1 - cl) / 2, alpha_post, beta_post)
-    efficiency = passed/total
+    efficiency = _get_efficiency(passed, total)
+
+    return _as_output(efficiency, upper_bound, lower_bound, return_bounds)
+
+
+
+def get_normal_interval(
+    passed:        Union[float, int, np.ndarray],
+    total:         Union[float, int, np.ndarray],
+    cl:            float = 0.6826894921370859,
+    return_bounds: bool  = False
+) -> tuple:
+    """
+    Calculate the normal approximation interval for binomial proportion.
+
+    Args:
+        passed: Number of successes
+        total: Total number of trials
+        cl: Confidence level (default is 1-sigma)
+        return_bounds: Return the lower and upper bounds in place of the errors
+
+    Returns:
+        tuple: (efficiency, upper error, lower error), or
+        (efficiency, upper bound, lower bound) if `return_bounds` is set
+    """
+    passed, total = _as_counts(passed, total)
+    efficiency = _get_efficiency(passed, total)
+
+    kappa = norm.ppf(1 - (1 - cl) / 2)
+    delta = kappa * np.sqrt(efficiency * (1 - efficiency) / np.where(total > 0, total, 1.))
+
+    lower_bound = np.where(total > 0, np.maximum(0., efficiency - delta), 0.)
+    upper_bound = np.where(total > 0, np.minimum(1., efficiency + delta), 1.)
+
+    return _as_output(efficiency, upper_bound, lower_bound, return_bounds)
+
+
+
+
+def get_wilson_interval(
+    passed:        Union[float, int, np.ndarray],
+    total:         Union[float, int, np.ndarray],
+    cl:            float = 0.6826894921370859,
+    return_bounds: bool  = False
+) -> tuple:
+    """
+    Calculate Wilson score interval for binomial proportion.
+
+    Args:
+        passed: Number of successes
+        total: Total number of trials
+        cl: Confidence level (default is 1-sigma)
+        return_bounds: Return the lower and upper bounds in place of the errors
+
+    Returns:
+        tuple: (efficiency, upper error, lower error), or
+        (efficiency, upper bound, lower bound) if `return_bounds` is set
+    """
+    passed, total = _as_counts(passed, total)
+    efficiency = _get_efficiency(passed, total)
+
+    kappa = norm.ppf(1 - (1 - cl) / 2)
+    mode  = (passed + 0.5 * kappa**2) / (total + kappa**2)
+    delta = kappa / (total + kappa**2) * np.sqrt(total * efficiency * (1 - efficiency) + kappa**2 / 4)
+
+    lower_bound = np.where(total > 0, np.maximum(0., mode - delta), 0.)
+    upper_bound = np.where(total > 0, np.minimum(1., mode + delta), 1.)
+
+    return _as_output(efficiency, upper_bound, lower_bound, return_bounds)
+
+
+
+
+def get_agresti_coull_interval(
+    passed:        Union[float, int, np.ndarray],
+    total:         Union[float, int, np.ndarray],
+    cl:            float = 0.6826894921370859,
+    return_bounds: bool  = False
+) -> tuple:
+    """
+    Calculate Agresti-Coull interval for binomial proportion.
+
+    Args:
+        passed: Number of successes
+        total: Total number of trials
+        cl: Confidence level (default is 1-sigma)
+        return_bounds: Return the lower and upper bounds in place of the errors
+
+    Returns:
+        tuple: (efficiency, upper error, lower error), or
+        (efficiency, upper bound, lower bound) if `return_bounds` is set
+    """
+    passed, total = _as_counts(passed, total)
+    efficiency = _get_efficiency(passed, total)
+
+    kappa = norm.ppf(1 - (1 - cl) / 2)
+    mode  = (passed + 0.5 * kappa**2) / (total + kappa**2)
+    delta = kappa * np.sqrt(mode * (1 - mode) / (total + kappa**2))
+
+    lower_bound = np.where(total > 0, np.maximum(0., mode - delta), 0.)
+    upper_bound = np.where(total > 0, np.minimum(1., mode + delta), 1.)
+
+    return _as_output(efficiency, upper_bound, lower_bound, return_bounds)
+
+
+
+
+FELDMAN_COUSINS_CACHE_SIZE = 256
+# Rows (total + 1 per belt, 16 bytes each) kept over all belts, 32 MiB
+FELDMAN_COUSINS_CACHE_ROWS = 2**21
+_feldman_cousins_belts = OrderedDict()
+
+
+def _solve_feldman_cousins_bounds(
+    total:   int,
+    cl:      float,
+    x_lower: np.ndarray,
+    x_upper: np.ndarray,
+    tol:     float = 1e-9
+) -> tuple:
+    """
+    Invert the Feldman-Cousins acceptance sets for `total` trials.
+
+    Acceptance sets are ordered by the likelihood ratio L(p)/L(p_hat) and
+    their edges are inverted by bisection in p, as TEfficiency does. The
+    lower bounds of all `x_lower` and the upper bounds of all `x_upper` are
+    searched together.
+
+    The log likelihood ratio -n * KL(x/n || p) is concave in x, so the
+    acceptance set grows outwards from x = n * p and only a window of
+    +-12 sigma around it is ever reached before the set is complete.
+    """
+    alpha = 1 - cl
+    x_lower = np.asarray(x_lower, dtype=np.float64)
+    x_upper = np.asarray(x_upper, dtype=np.float64)
+
+    width = int(min(total + 1, 2 * np.ceil(6 * np.sqrt(total)) + 5))
+    offsets = np.arange(width)
+
+    x_all = np.arange(total + 1, dtype=np.float64)
+    log_binom = gammaln(total + 1) - gammaln(x_all + 1) - gammaln(total - x_all + 1)
+    p_hat = x_all / total
+    log_l_hat = xlogy(x_all, p_hat) + xlogy(total - x_all, 1 - p_hat)
+
+    def acceptance_edges(p):
+        start = np.clip(np.rint(total * p).astype(np.intp) - width // 2, 0, total + 1 - width)
+        index = start[:, None] + offsets
+        x = x_all[index]
+
+        log_l = xlogy(x, p[:, None]) + xlog1py(total - x, -p[:, None])
+        order = np.argsort(log_l_hat[index] - log_l, axis=1, kind="stable")
+        probs = np.take_along_axis(np.exp(log_binom[index] + log_l), order, axis=1)
+        x_sorted = np.take_along_axis(x, order, axis=1)
+
+        # The set is complete at the first point where the missing probability drops below alpha
+        is_complete = 1 - np.cumsum(probs, axis=1) <= alpha
+        last = np.where(is_complete.any(axis=1), is_complete.argmax(axis=1), width - 1)[:, None]
+
+        x_low  = np.take_along_axis(np.minimum.accumulate(x_sorted, axis=1), last, axis=1)[:, 0]
+        x_high = np.take_along_axis(np.maximum.accumulate(x_sorted, axis=1), last, axis=1)[:, 0]
+        return x_low, x_high
+
+    n_lower = len(x_lower)
+    X = np.concatenate([x_lower, x_upper])
+    p_min = np.zeros(len(X))
+    p_max = np.ones(len(X))
+    p = np.zeros(len(X))
 
-    return efficiency, abs(efficiency - upper_bound), abs(efficiency - lower_bound)
+    while len(X) and p_max[0] - p_min[0] > tol:
+        p = 0.5 * (p_min + p_max)
+        x_low, x_high = acceptance_edges(p)
+
+        go_up = np.concatenate([x_high[:n_lower] < X[:n_lower], x_low[n_lower:] <= X[n_lower:]])
+        p_min = np.where(go_up, p, p_min)
+        p_max = np.where(go_up, p_max, p)
+
+    lower = np.where(x_lower == 0, 0., p[:n_lower])
+    upper = np.where(x_upper == total, 1., p[n_lower:])
+
+    return lower, upper
+
+
+def _get_feldman_cousins_belt(
+    total:   int,
+    cl:      float,
+    x_lower: np.ndarray,
+    x_upper: np.ndarray
+) -> np.ndarray:
+    """
+    Return the cached Feldman-Cousins belt for `total` trials.
+
+    The belt has shape (total + 1, 2) with the lower and upper bound for each
+    integer number of successes. It is filled lazily: only the rows asked for
+    in `x_lower`/`x_upper` that are not cached yet are computed. The most
+    recently used belts are kept, at most FELDMAN_COUSINS_CACHE_SIZE of them
+    and FELDMAN_COUSINS_CACHE_ROWS rows in total; a belt with more rows than
+    that is not cached at all.
+    """
+    key = (total, cl)
+    belt = _feldman_cousins_belts.get(key)
+
+    if belt is None:
+        belt = np.full((total + 1, 2), np.nan)
+        if len(belt) <= FELDMAN_COUSINS_CACHE_ROWS:
+            _feldman_cousins_belts[key] = belt
+            n_rows = sum(len(b) for b in _feldman_cousins_belts.values())
+            while len(_feldman_cousins_belts) > FELDMAN_COUSINS_CACHE_SIZE or n_rows > FELDMAN_COUSINS_CACHE_ROWS:
+                _, evicted = _feldman_cousins_belts.popitem(last=False)
+                n_rows -= len(evicted)
+    else:
+        _feldman_cousins_belts.move_to_end(key)
+
+    x_lower = np.unique(x_lower)
+    x_upper = np.unique(x_upper)
+    x_lower = x_lower[np.isnan(belt[x_lower, 0])]
+    x_upper = x_upper[np.isnan(belt[x_upper, 1])]
+
+    if len(x_lower) or len(x_upper):
+        belt[x_lower, 0], belt[x_upper, 1] = _solve_feldman_cousins_bounds(total, cl, x_lower, x_upper)
+
+    return belt
+
+
+def clear_feldman_cousins_cache():
+    """Drop all cached Feldman-Cousins belts."""
+    _feldman_cousins_belts.clear()
+
+
+def get_feldman_cousins_interval(
+    passed:        Union[float, int, np.ndarray],
+    total:         Union[float, int, np.ndarray],
+    cl:            float = 0.6826894921370859,
+    return_bounds: bool  = False
+) -> tuple:
+    """
+    Calculate Feldman-Cousins interval for binomial proportion.
+
+    Bounds are looked up in a confidence belt cached per (total, cl), so all
+    bins sharing a total, in this and later calls, cost one array lookup
+    once their rows are known. Non-integer totals are truncated and
+    non-integer passed values take the lower bound of ceil(passed) and the
+    upper bound of floor(passed), as in TEfficiency.
+
+    Args:
+        passed: Number of successes
+        total: Total number of trials
+        cl: Confidence level (default is 1-sigma)
+        return_bounds: Return the lower and upper bounds in place of the errors
+
+    Returns:
+        tuple: (efficiency, upper error, lower error), or
+        (efficiency, upper bound, lower bound) if `return_bounds` is set
+    """
+    passed, total = _as_counts(passed, total)
+    efficiency = _get_efficiency(passed, total)
+
+    n_trials = np.trunc(total).astype(np.int64)
+    lower_bound = np.zeros(passed.shape)
+    upper_bound = np.ones(passed.shape)
+
+    for n in np.unique(n_trials[n_trials > 0]):
+        in_total = n_trials == n
+        x_lower = np.clip(np.ceil(passed[in_total]),  0, n).astype(np.intp)
+        x_upper = np.clip(np.floor(passed[in_total]), 0, n).astype(np.intp)
+
+        belt = _get_feldman_cousins_belt(int(n), cl, x_lower, x_upper)
+        lower_bound[in_total] = belt[x_lower, 0]
+        upper_bound[in_total] = belt[x_upper, 1]
+
+    return _as_output(efficiency, upper_bound, lower_bound, return_bounds)
+
+
+
+
+def get_mid_p_interval(
+    passed:        Union[float, int, np.ndarray],
+    total:         Union[float, int, np.ndarray],
+    cl:            float = 0.6826894921370859,
+    tol:           float = 1e-9,
+    return_bounds: bool  = False
+) -> tuple:
+    """
+    Calculate mid-P interval for binomial proportion.
+
+    The binomial tail sums are written through the beta distribution, so
+    non-integer counts are accepted; 0 < passed < 1 interpolates linearly
+    between passed = 0 and passed = 1, as in TEfficiency.
+
+    Args:
+        passed: Number of successes
+        total: Total number of trials
+        cl: Confidence level (default is 1-sigma)
+        tol: Bisection tolerance on the bounds
+        return_bounds: Return the lower and upper bounds in place of the errors
+
+    Returns:
+        tuple: (efficiency, upper error, lower error), or
+        (efficiency, upper bound, lower bound) if `return_bounds` is set
+    """
+    passed, total = _as_counts(passed, total)
+    efficiency = _get_efficiency(passed, total)
+
+    alpha_min = (1 - cl) / 2
+
+    # Many bins share the same counts; solve each distinct pair once
+    pairs, inverse = np.unique(np.stack([passed.ravel(), total.ravel()]), axis=1, return_inverse=True)
+    k, n = pairs
+    inverse = inverse.reshape(passed.shape)
+
+    def get_bound(k, target):
+        p_min = np.zeros(k.shape)
+        p_max = np.ones(k.shape)
+        p = np.zeros(k.shape)
+        has_tail = k >= 1
+        log_norm = -betaln(k + 1, n - k + 1) - np.log(n + 1)
+
+        while np.any(p_max - p_min > tol):
+            p = 0.5 * (p_min + p_max)
+            # Mid-P tail: P(X < k) + P(X = k) / 2
+            v = 0.5 * np.exp(log_norm + xlogy(k, p) + xlog1py(n - k, -p))
+            v += np.where(has_tail, beta.sf(p, np.where(has_tail, k, 1.), n - k + 1), 0.)
+
+            go_up = v > target
+            p_min = np.where(go_up, p, p_min)
+            p_max = np.where(go_up, p_max, p)
+
+        return p
+
+    is_fractional = (k > 0) & (k < 1)
+    bounds = []
+    for target in (1 - alpha_min, alpha_min):
+        bound = get_bound(np.where(is_fractional, 0., k), target)
+        if np.any(is_fractional):
+            bound_one = get_bound(np.ones(k.shape), target)
+            bound = np.where(is_fractional, bound + (bound_one - bound) * k, bound)
+        bounds.append(bound)
+
+    lower_bound = np.where(k > 0, bounds[0], 0.)[inverse]
+    upper_bound = np.where(k < n, bounds[1], 1.)[inverse]
+
+    return _as_output(efficiency, upper_bound, lower_bound, return_bounds)
+
+
+
+_INTERVAL_FUNCTIONS = {
+    "normal":          get_normal_interval,
+    "clopper_pearson": get_clopper_pearson_interval,
+    "bayesian":        get_bayesian_interval,
+    "wilson":          get_wilson_interval,
+    "feldman_cousins": get_feldman_cousins_interval,
+    "agresti_coull":   get_agresti_coull_interval,
+    "mid_p_interval":  get_mid_p_interval,
+    "jeffrey":         partial(get_bayesian_interval, alpha_prior=0.5, beta_prior=0.5),
+    "uniform_prior":   partial(get_bayesian_interval, alpha_prior=1,   beta_prior=1),
+}
 
 
 
 def get_eff_with_error(
-    passed:      Union[int, float],
-    total:       Union[int, float],
+    passed:      Union[int, float, np.ndarray],
+    total:       Union[int, float, np.ndarray],
     stat_option:  str   = "Clopper Pearson",
-    cl:          float = 0.6826894921370859
+    cl:          float = 0.6826894921370859,
+    use_table:   bool  = False
 ) -> tuple:
     """
     Calculate efficiency and errors using specified statistical method.
 
+    `passed` and `total` may be scalars or arrays of any shape; arrays are
+    evaluated in one vectorized call and arrays are returned.
+
     Args:
         passed: Number of successes
         total: Total number of trials
-        stat_option: Statistical method to use ('Clopper Pearson' or 'Bayesian')
+        stat_option: Statistical method to use, with the same aliases as
+            root.utils.teff.set_stat_option ('Normal', 'Clopper Pearson',
+            'Bayesian', 'Wilson', 'Feldman Cousins', 'Agresti Coull',
+            'Mid P Interval', 'Jeffrey' or 'Uniform Prior')
         cl: Confidence level (default is 1-sigma)
+        use_table: Look integer counts up in the cached IntervalTable for
+            (stat_option, cl) instead of computing the interval; ignored
+            for Feldman-Cousins and mid-P, which are not tabulated
 
     Returns:
         tuple: (efficiency, upper error, lower error)
@@ -84,24 +557,677 @@ def get_eff_with_error(
     Raises:
         ValueError: If invalid statistical method is specified
     """
-    stat_option = stat_option.lower()
-
-    clopper_pearson_options = {"clopper_pearson", "kfcp", "clopper pearson",
-                               "clopper-pearson", "clopper.pearson",
-                               "clopper:pearson", "clopperpearson"}
-    bayesian_options = {"bayesian", "kbbayesian"}
-    allowed_options = clopper_pearson_options | bayesian_options  # Combine sets using union operator
+    stat_option = _resolve_stat_option(stat_option)
 
-    if stat_option in clopper_pearson_options:
-        eff, deff_up, deff_low = get_clopper_pearson_interval(passed, total, cl=cl)
-    elif stat_option in bayesian_options:  # Use bayesian_options directly here
-        eff, deff_up, deff_low = get_bayesian_interval(passed, total, cl=cl)
+    if use_table and stat_option not in _UNTABULATED_OPTIONS:
+        eff, deff_up, deff_low = get_interval_table(stat_option, cl=cl).get_interval(passed, total)
     else:
-        raise ValueError(f"Invalid statistic option '{stat_option}'! Allowed options are: {', '.join(allowed_options)}")
+        eff, deff_up, deff_low = _INTERVAL_FUNCTIONS[stat_option](passed, total, cl=cl)
 
     return eff, deff_up, deff_low
 
 
+
+def get_interval_bounds(
+    passed:      Union[int, float, np.ndarray],
+    total:       Union[int, float, np.ndarray],
+    stat_option: str   = "Clopper Pearson",
+    cl:          float = 0.6826894921370859
+) -> tuple:
+    """
+    Calculate the lower and upper interval bounds with the specified method.
+
+    Unlike the errors of get_eff_with_error, the bounds keep their position
+    when they do not enclose passed/total (e.g. Bayesian intervals at
+    passed == 0).
+
+    Args:
+        passed: Number of successes
+        total: Total number of trials
+        stat_option: Statistical method to use (see get_eff_with_error)
+        cl: Confidence level (default is 1-sigma)
+
+    Returns:
+        tuple: (lower bound, upper bound)
+    """
+    stat_option = _resolve_stat_option(stat_option)
+    _, upper_bound, lower_bound = _INTERVAL_FUNCTIONS[stat_option](passed, total, cl=cl, return_bounds=True)
+
+    return lower_bound, upper_bound
+
+
+
+def get_effective_entries(
+    sumw:  Union[float, np.ndarray],
+    sumw2: Union[float, np.ndarray]
+) -> Union[float, np.ndarray]:
+    """
+    Calculate the effective number of entries (sum w)^2 / sum w^2.
+
+    Args:
+        sumw: Sum of weights
+        sumw2: Sum of squared weights
+
+    Returns:
+        Effective number of entries, 0 where sumw2 is 0
+    """
+    sumw, sumw2 = _as_counts(sumw, sumw2)
+    has_sumw2 = sumw2 > 0
+
+    return np.where(has_sumw2, sumw**2 / np.where(has_sumw2, sumw2, 1.), 0.)[()]
+
+
+def get_weighted_eff_with_error(
+    passed_sumw:   Union[float, np.ndarray],
+    passed_sumw2:  Union[float, np.ndarray],
+    total_sumw:    Union[float, np.ndarray],
+    total_sumw2:   Union[float, np.ndarray],
+    stat_option:   str   = "Normal",
+    cl:            float = 0.6826894921370859,
+    alpha_prior:   float = 1,
+    beta_prior:    float = 1,
+    return_bounds: bool  = False
+) -> tuple:
+    """
+    Calculate efficiency and errors from weighted passed/total counts.
+
+    Follows the weighted mode of TEfficiency: the normal approximation uses
+    the weighted binomial variance
+
+        (sumw2_p * (1 - 2 * eff) + sumw2_t * eff^2) / sumw_t^2,
+
+    while the Bayesian methods rescale both counts by sumw_t / sumw2_t, so
+    the total becomes the effective number of entries, before adding the
+    prior. Other frequentist methods are not defined for weights and, as in
+    TEfficiency, fall back to the normal approximation with a warning.
+
+    All inputs may be arrays of any shape, e.g. the bin contents and sumw2
+    arrays of whole 2D histograms.
+
+    Args:
+        passed_sumw: Sum of weights of passed events
+        passed_sumw2: Sum of squared weights of passed events
+        total_sumw: Sum of weights of all events
+        total_sumw2: Sum of squared weights of all events
+        stat_option: Statistical method to use (see get_eff_with_error)
+        cl: Confidence level (default is 1-sigma)
+        alpha_prior: Prior alpha parameter ('Bayesian' only)
+        beta_prior: Prior beta parameter ('Bayesian' only)
+        return_bounds: Return the lower and upper bounds in place of the errors
+
+    Returns:
+        tuple: (efficiency, upper error, lower error), or
+        (efficiency, upper bound, lower bound) if `return_bounds` is set
+    """
+    stat_option = _resolve_stat_option(stat_option)
+
+    passed_sumw, passed_sumw2, total_sumw, total_sumw2 = np.broadcast_arrays(
+        *(np.asarray(a, dtype=np.float64) for a in (passed_sumw, passed_sumw2, total_sumw, total_sumw2))
+    )
+    efficiency = _get_efficiency(passed_sumw, total_sumw)
+    has_total = total_sumw != 0
+
+    if stat_option in ("bayesian", "jeffrey", "uniform_prior"):
+        if stat_option == "jeffrey":
+            alpha_prior, beta_prior = 0.5, 0.5
+        elif stat_option == "uniform_prior":
+            alpha_prior, beta_prior = 1, 1
+
+        has_sumw2 = total_sumw2 > 0
+        norm_w = np.where(has_sumw2, total_sumw / np.where(has_sumw2, total_sumw2, 1.), 0.)
+        alpha_post = passed_sumw * norm_w + alpha_prior
+        beta_post  = (total_sumw - passed_sumw) * norm_w + beta_prior
+
+        lower_bound = beta.ppf((1 - cl) / 2, alpha_post, beta_post)
+        upper_bound = beta.ppf(1 - (1 - cl) / 2, alpha_post, beta_post)
+
+        # TEfficiency reports zero errors when sum w^2 of the total vanishes
+        lower_bound = np.where(has_sumw2, lower_bound, efficiency)
+        upper_bound = np.where(has_sumw2, upper_bound, efficiency)
+
+    else:
+        if stat_option != "normal":
+            warnings.warn(
+                f"Frequentist intervals for weights are only supported by the normal approximation, "
+                f"using 'Normal' instead of '{stat_option}'!"
+            )
+
+        total_sumw_safe = np.where(has_total, total_sumw, 1.)
+        variance = (passed_sumw2 * (1 - 2 * efficiency) + total_sumw2 * efficiency**2) / total_sumw_safe**2
+        delta = norm.ppf(1 - (1 - cl) / 2) * np.sqrt(np.maximum(variance, 0.))
+
+        lower_bound = np.maximum(0., efficiency - delta)
+        upper_bound = np.minimum(1., efficiency + delta)
+
+    lower_bound = np.where(has_total, lower_bound, 0.)
+    upper_bound = np.where(has_total, upper_bound, 1.)
+
+    return _as_output(efficiency, upper_bound, lower_bound, return_bounds)
+
+
+
+class EfficiencyAccumulator:
+    """
+    Binned passed/total counts that can be filled chunk by chunk and merged.
+
+    Only the bin edges and the count arrays are stored, so accumulators are
+    cheap to pickle and send between processes; intervals are computed when
+    result() is called. Weighted fills track sum(w) and sum(w^2) per bin,
+    starting from the unweighted counts if filled without weights before.
+    Entries outside the edges are ignored.
+
+    Args:
+        edges: Bin edges, one array for 1D or a sequence of arrays for ND
+    """
+
+    def __init__(self, edges):
+        if np.ndim(edges[0]) == 0:
+            edges = [edges]
+        self.edges = tuple(np.asarray(e, dtype=np.float64) for e in edges)
+        self.shape = tuple(len(e) - 1 for e in self.edges)
+
+        self.passed = np.zeros(self.shape)
+        self.total  = np.zeros(self.shape)
+        self.passed_sumw2 = None
+        self.total_sumw2  = None
+
+
+    @property
+    def is_weighted(self) -> bool:
+        return self.total_sumw2 is not None
+
+
+    def _enable_sumw2(self):
+        if not self.is_weighted:
+            self.passed_sumw2 = self.passed.copy()
+            self.total_sumw2  = self.total.copy()
+
+
+    def _get_bin_index(self, x) -> tuple:
+        """Return the flat bin index of every entry and the mask of entries inside the edges."""
+        x = np.asarray(x, dtype=np.float64)
+        if len(self.edges) == 1:
+            x = x.reshape(-1, 1)
+        elif x.ndim == 2 and x.shape[1] != len(self.edges):
+            x = x.T
+
+        inside = np.ones(len(x), dtype=bool)
+        indices = []
+        for dim, edges in enumerate(self.edges):
+            index = np.searchsorted(edges, x[:, dim], side="right") - 1
+            inside &= (index >= 0) & (index < len(edges) - 1)
+            indices.append(index)
+
+        flat = np.ravel_multi_index([i[inside] for i in indices], self.shape)
+        return flat, inside
+
+
+    def fill(self, x, passed_mask, weights=None):
+        """
+        Add a chunk of entries.
+
+        Args:
+            x: Entry coordinates, shape (n,) for 1D or (n, ndim) / (ndim, n) for ND
+            passed_mask: Boolean array of length n, True for passed entries
+            weights: Optional per-entry weights
+
+        Returns:
+            EfficiencyAccumulator: self
+        """
+        flat, inside = self._get_bin_index(x)
+        passed_mask = np.asarray(passed_mask, dtype=bool)[inside]
+        size = self.passed.size
+
+        w = None if weights is None else np.asarray(weights, dtype=np.float64)[inside]
+
+        # Copy the unweighted counts into sum(w^2) before this chunk's sum(w) is added to them
+        if w is not None:
+            self._enable_sumw2()
+
+        self.total  += np.bincount(flat, weights=w, minlength=size).reshape(self.shape)
+        self.passed += np.bincount(flat[passed_mask], weights=None if w is None else w[passed_mask], minlength=size).reshape(self.shape)
+
+        if w is not None:
+            self.total_sumw2  += np.bincount(flat, weights=w**2, minlength=size).reshape(self.shape)
+            self.passed_sumw2 += np.bincount(flat[passed_mask], weights=w[passed_mask]**2, minlength=size).reshape(self.shape)
+        elif self.is_weighted:
+            self.total_sumw2  += np.bincount(flat, minlength=size).reshape(self.shape)
+            self.passed_sumw2 += np.bincount(flat[passed_mask], minlength=size).reshape(self.shape)
+
+        return self
+
+
+    def merge(self, *others):
+        """
+        Add the counts of other accumulators with the same edges.
+
+        Returns:
+            EfficiencyAccumulator: self
+
+        Raises:
+            ValueError: If the binning differs
+        """
+        for other in others:
+            if len(other.edges) != len(self.edges) or not all(
+                np.array_equal(a, b) for a, b in zip(self.edges, other.edges)
+            ):
+                raise ValueError("Cannot merge accumulators with different binning!")
+
+            if other.is_weighted:
+                self._enable_sumw2()
+            if self.is_weighted:
+                self.passed_sumw2 += other.passed_sumw2 if other.is_weighted else other.passed
+                self.total_sumw2  += other.total_sumw2  if other.is_weighted else other.total
+
+            self.passed += other.passed
+            self.total  += other.total
+
+        return self
+
+
+    def result(
+        self,
+        stat_option: Union[str, None] = None,
+        cl:          float = 0.6826894921370859
+    ) -> tuple:
+        """
+        Compute the efficiency of every bin.
+
+        Args:
+            stat_option: Statistical method (default is 'Clopper Pearson',
+                or 'Normal' once weighted fills have been made)
+            cl: Confidence level (default is 1-sigma)
+
+        Returns:
+            tuple: (efficiency, upper error, lower error), arrays of the bin shape
+        """
+        if self.is_weighted:
+            return get_weighted_eff_with_error(
+                self.passed, self.passed_sumw2, self.total, self.total_sumw2,
+                stat_option=stat_option or "Normal", cl=cl
+            )
+        return get_eff_with_error(self.passed, self.total, stat_option=stat_option or "Clopper Pearson", cl=cl)
+
+
+
+_toy_state = {}
+
+
+def _init_toy_worker(passed, total, func, mode):
+    """Store the inputs shared by all toy blocks of one process."""
+    _toy_state.update(passed=passed, total=total, func=func, mode=mode)
+
+
+def _run_toy_block(seed_seq: np.random.SeedSequence, n_toys: int, reduce: bool):
+    """
+    Generate one block of toys with its own generator and evaluate `func`.
+
+    Returns the toy results, or (count, mean, M2) of them if `reduce` is set.
+    """
+    passed, total = _toy_state["passed"], _toy_state["total"]
+    rng = np.random.default_rng(seed_seq)
+    size = (n_toys,) + passed.shape
+
+    if _toy_state["mode"] == "binomial":
+        toy_total  = np.broadcast_to(total, size)
+        toy_passed = rng.binomial(total.astype(np.int64), _get_efficiency(passed, total), size=size).astype(np.float64)
+    else:
+        toy_passed = rng.poisson(passed, size=size).astype(np.float64)
+        toy_total  = toy_passed + rng.poisson(total - passed, size=size)
+
+    values = np.asarray(_toy_state["func"](toy_passed, toy_total), dtype=np.float64)
+    if not reduce:
+        return values
+
+    mean = values.mean(axis=0)
+    return n_toys, mean, ((values - mean)**2).sum(axis=0)
+
+
+def _iter_toy_blocks(passed, total, func, n_toys, mode, block_size, n_workers, seed, reduce):
+    """Yield the result of every toy block in block order."""
+    if mode not in ("binomial", "poisson"):
+        raise ValueError(f"Invalid toy mode '{mode}'! Allowed modes are: binomial, poisson")
+
+    passed, total = _as_counts(passed, total)
+    func = _get_efficiency if func is None else func
+
+    # One independent stream per block, so results depend on the seed and
+    # block size but not on how the blocks are spread over workers
+    sizes = [min(block_size, n_toys - start) for start in range(0, n_toys, block_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args  = (passed, total, func, mode)
+
+    if n_workers == 1:
+        _init_toy_worker(*args)
+        for seed_seq, size in zip(seeds, sizes):
+            yield _run_toy_block(seed_seq, size, reduce)
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_toy_worker, initargs=args) as executor:
+            yield from executor.map(_run_toy_block, seeds, sizes, [reduce] * len(sizes))
+
+
+def get_toy_mc_values(
+    passed:     Union[float, int, np.ndarray],
+    total:      Union[float, int, np.ndarray],
+    func:       Union[Callable, None] = None,
+    n_toys:     int = 1000,
+    mode:       str = "binomial",
+    block_size: int = 100,
+    n_workers:  Union[int, None] = 1,
+    seed:       Union[int, None] = None
+) -> np.ndarray:
+    """
+    Evaluate `func` on toy passed/total counts and return all toy results.
+
+    Toys are drawn in vectorized blocks of `block_size`, each from its own
+    numpy.random.Generator spawned from `seed`, and blocks are spread over
+    `n_workers` processes (None uses every CPU). For a given seed and block
+    size the toys are identical whatever the number of workers.
+
+    Args:
+        passed: Number of successes per bin
+        total: Total number of trials per bin
+        func: Function of (passed, total) toy arrays, with the toy index as
+            leading axis, returning an array with the same leading axis. It
+            must be picklable (module level) when n_workers != 1. Default is
+            the efficiency passed/total.
+        n_toys: Number of toys
+        mode: 'binomial' keeps total fixed and fluctuates passed, 'poisson'
+            fluctuates passed and failed independently
+        block_size: Number of toys generated per block
+        n_workers: Number of worker processes
+        seed: Seed of the toy generators
+
+    Returns:
+        numpy.ndarray: Toy results with shape (n_toys, ...)
+    """
+    return np.concatenate(list(_iter_toy_blocks(
+        passed, total, func, n_toys, mode, block_size, n_workers, seed, reduce=False
+    )))
+
+
+def get_toy_mc_uncertainty(
+    passed:     Union[float, int, np.ndarray],
+    total:      Union[float, int, np.ndarray],
+    func:       Union[Callable, None] = None,
+    n_toys:     int = 1000,
+    mode:       str = "binomial",
+    block_size: int = 100,
+    n_workers:  Union[int, None] = 1,
+    seed:       Union[int, None] = None
+) -> tuple:
+    """
+    Calculate the toy MC spread of `func` without keeping the toys.
+
+    Same toys as get_toy_mc_values, but each block is reduced to its mean
+    and sum of squared deviations in the worker and blocks are merged in
+    order, so memory stays at a few arrays of the output shape.
+
+    Args:
+        See get_toy_mc_values.
+
+    Returns:
+        tuple: (nominal value, toy mean, toy standard deviation)
+    """
+    passed, total = _as_counts(passed, total)
+    nominal = (_get_efficiency if func is None else func)(passed[None], total[None])[0]
+
+    count, mean, m2 = 0, 0., 0.
+    for block_count, block_mean, block_m2 in _iter_toy_blocks(
+        passed, total, func, n_toys, mode, block_size, n_workers, seed, reduce=True
+    ):
+        # Chan et al. pairwise update of the running mean and M2
+        delta = block_mean - mean
+        merged = count + block_count
+        mean = mean + delta * block_count / merged
+        m2 = m2 + block_m2 + delta**2 * count * block_count / merged
+        count = merged
+
+    std = np.sqrt(m2 / (count - 1)) if count > 1 else np.zeros_like(mean)
+
+    return nominal[()], np.asarray(mean)[()], np.asarray(std)[()]
+
+
+
+def efficiency_table(
+    df:          pd.DataFrame,
+    passed_col:  str,
+    total_col:   str,
+    by:          Union[str, list, None] = None,
+    stat_option: str   = "Clopper Pearson",
+    cl:          float = 0.6826894921370859,
+    use_table:   bool  = False,
+    cols:        dict  = {"eff": "eff", "err_up": "err_up", "err_low": "err_low"}
+) -> pd.DataFrame:
+    """
+    Calculate the efficiency of every group of a DataFrame.
+
+    Passed and total counts are summed per group with a single groupby and
+    all intervals are then evaluated in one vectorized get_eff_with_error call.
+
+    Args:
+        df: Input DataFrame
+        passed_col: Column with the number of successes
+        total_col: Column with the number of trials
+        by: Column name(s) to group by; None sums the whole DataFrame
+        stat_option: Statistical method to use (see get_eff_with_error)
+        cl: Confidence level (default is 1-sigma)
+        use_table: Look integer counts up in the cached IntervalTable
+        cols: Names of the efficiency and error columns
+
+    Returns:
+        pandas.DataFrame: One row per group with the summed passed/total
+        columns followed by the efficiency and its errors
+    """
+    if by is None:
+        summed = df[[passed_col, total_col]].sum().to_frame().T
+    else:
+        summed = df.groupby(by, sort=True, observed=True)[[passed_col, total_col]].sum().reset_index()
+
+    eff, deff_up, deff_low = get_eff_with_error(
+        summed[passed_col].to_numpy(),
+        summed[total_col].to_numpy(),
+        stat_option=stat_option, cl=cl, use_table=use_table
+    )
+
+    summed[cols["eff"]]     = eff
+    summed[cols["err_up"]]  = deff_up
+    summed[cols["err_low"]] = deff_low
+
+    return summed
+
+
+
+# Format of the IntervalTable files, part of their name; bump it whenever
+# the stored bounds change so that tables cached by older versions are not reused
+#   1: bounds rebuilt as eff -/+ abs(error)
+#   2: raw interval bounds (correct for Bayesian at passed == 0)
+_INTERVAL_TABLE_VERSION = 2
+
+# Methods too slow to precompute for every pair up to max_total; Feldman-Cousins
+# keeps its own belts (_get_feldman_cousins_belt), and get_eff_with_error
+# computes both directly even with use_table=True
+_UNTABULATED_OPTIONS = {"feldman_cousins", "mid_p_interval"}
+
+
+class IntervalTable:
+    """
+    Precomputed interval bounds for integer (passed, total) pairs.
+
+    Bounds for every 0 <= passed <= total <= `max_total` are computed once
+    and stored as a .npy file under `cache_dir`, which is memory-mapped on
+    later use, so a lookup is plain array indexing. Integer pairs above
+    `max_total` go through an in-memory LRU of size `lru_size`; non-integer
+    counts are always computed directly.
+
+    Args:
+        stat_option: Any statistical method accepted by get_eff_with_error
+        cl: Confidence level (default is 1-sigma)
+        alpha_prior: Prior alpha parameter (Bayesian only)
+        beta_prior: Prior beta parameter (Bayesian only)
+        max_total: Largest `total` stored in the table
+        cache_dir: Directory for the table files (default is
+            $DDFUTILS_CACHE_DIR or ~/.cache/ddfUtils)
+        lru_size: Number of out-of-table pairs kept in memory
+
+    Raises:
+        ValueError: For Feldman-Cousins and mid-P, which are not tabulated
+    """
+
+    def __init__(
+        self,
+        stat_option: str   = "Clopper Pearson",
+        cl:          float = 0.6826894921370859,
+        alpha_prior: float = 1,
+        beta_prior:  float = 1,
+        max_total:   int   = 1000,
+        cache_dir:   Union[str, None] = None,
+        lru_size:    int   = 65536
+    ):
+        self.stat_option = _resolve_stat_option(stat_option)
+        if self.stat_option in _UNTABULATED_OPTIONS:
+            raise ValueError(f"Statistic option '{stat_option}' cannot be tabulated! Compute it directly instead")
+
+        self.cl          = cl
+        self.alpha_prior = alpha_prior
+        self.beta_prior  = beta_prior
+        self.max_total   = int(max_total)
+        self.lru_size    = lru_size
+
+        self.cache_dir = get_cache_dir() if cache_dir is None else cache_dir
+
+        self._lru   = OrderedDict()
+        self._table = self._load_or_build()
+
+
+    @property
+    def path(self) -> str:
+        """File the table is stored in."""
+        name = f"v{_INTERVAL_TABLE_VERSION}_{self.stat_option}_cl{self.cl:.12g}_n{self.max_total}"
+        if self.stat_option == "bayesian":
+            name += f"_a{self.alpha_prior:g}_b{self.beta_prior:g}"
+        return os.path.join(self.cache_dir, f"{name}.npy")
+
+
+    def _compute_bounds(self, passed, total) -> tuple:
+        """Return (lower bound, upper bound) computed with scipy."""
+        if self.stat_option == "bayesian":
+            _, upper, lower = get_bayesian_interval(
+                passed, total, alpha_prior=self.alpha_prior, beta_prior=self.beta_prior,
+                cl=self.cl, return_bounds=True
+            )
+            return lower, upper
+        return get_interval_bounds(passed, total, self.stat_option, cl=self.cl)
+
+
+    def _load_or_build(self) -> np.ndarray:
+        path = self.path
+        if os.path.exists(path):
+            return np.load(path, mmap_mode="r")
+
+        n = self.max_total + 1
+        total, passed = np.meshgrid(np.arange(n), np.arange(n), indexing="ij")
+        valid = passed <= total
+
+        table = np.full((n, n, 2), np.nan)
+        table[valid, 0], table[valid, 1] = self._compute_bounds(passed[valid], total[valid])
+
+        # Write to a temporary file first so concurrent jobs never see a partial table
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, table)
+        os.replace(tmp_path, path)
+
+        return np.load(path, mmap_mode="r")
+
+
+    def _lookup_lru(self, passed: np.ndarray, total: np.ndarray) -> tuple:
+        """Bounds for integer pairs above `max_total`, through the LRU."""
+        pairs, inverse = np.unique(np.stack([passed, total], axis=-1), axis=0, return_inverse=True)
+        keys = [tuple(pair) for pair in pairs.astype(np.int64).tolist()]
+
+        bounds  = np.empty((len(keys), 2))
+        missing = []
+        for i, key in enumerate(keys):
+            if key in self._lru:
+                self._lru.move_to_end(key)
+                bounds[i] = self._lru[key]
+            else:
+                missing.append(i)
+
+        if missing:
+            lower, upper = self._compute_bounds(pairs[missing, 0], pairs[missing, 1])
+            bounds[missing, 0] = lower
+            bounds[missing, 1] = upper
+
+            for i in missing:
+                self._lru[keys[i]] = (bounds[i, 0], bounds[i, 1])
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+
+        bounds = bounds[inverse.reshape(-1)]
+        return bounds[:, 0], bounds[:, 1]
+
+
+    def get_bounds(self, passed, total) -> tuple:
+        """
+        Return the (lower bound, upper bound) for scalar or array counts.
+        """
+        passed, total = _as_counts(passed, total)
+        lower = np.empty(passed.shape)
+        upper = np.empty(passed.shape)
+
+        is_integer = (passed == np.floor(passed)) & (total == np.floor(total)) & (passed >= 0) & (passed <= total)
+        in_table   = is_integer & (total <= self.max_total)
+        in_lru     = is_integer & ~in_table
+        direct     = ~is_integer
+
+        if np.any(in_table):
+            bounds = self._table[total[in_table].astype(np.intp), passed[in_table].astype(np.intp)]
+            lower[in_table], upper[in_table] = bounds[:, 0], bounds[:, 1]
+
+        if np.any(in_lru):
+            lower[in_lru], upper[in_lru] = self._lookup_lru(passed[in_lru], total[in_lru])
+
+        if np.any(direct):
+            lower[direct], upper[direct] = self._compute_bounds(passed[direct], total[direct])
+
+        return lower[()], upper[()]
+
+
+    def get_interval(self, passed, total) -> tuple:
+        """
+        Drop-in replacement for the interval functions.
+
+        Returns:
+            tuple: (efficiency, upper error, lower error)
+        """
+        passed, total = _as_counts(passed, total)
+        lower, upper = self.get_bounds(passed, total)
+
+        return _as_output(_get_efficiency(passed, total), upper, lower)
+
+
+
+@lru_cache(maxsize=None)
+def get_interval_table(
+    stat_option: str   = "Clopper Pearson",
+    cl:          float = 0.6826894921370859,
+    alpha_prior: float = 1,
+    beta_prior:  float = 1,
+    max_total:   int   = 1000
+) -> IntervalTable:
+    """
+    Return the shared IntervalTable for the given (method, cl, prior, max_total).
+    """
+    return IntervalTable(
+        _resolve_stat_option(stat_option), cl=cl,
+        alpha_prior=alpha_prior, beta_prior=beta_prior, max_total=max_total
+    )
+
+
+
 def get_systematic_var_chi2_method(x, stat_vars, sys_vars):
     x = np.asarray(x)
     N = len(x)
@@ -132,3 +1258,99 @@ def get_systematic_var_chi2_method(x, stat_vars, sys_vars):
         raise RuntimeError("Root finding did not converge.")
 
     return result.root**2
+
+
+
+def get_systematic_var_chi2_method_batched(
+    x,
+    stat_vars,
+    sys_vars,
+    offsets,
+    xtol:     float = 2e-12,
+    rtol:     float = 4 * np.finfo(float).eps,
+    max_iter: int   = 200
+) -> tuple:
+    """
+    Solve get_systematic_var_chi2_method for many independent groups at once.
+
+    Groups are stored back to back in flat arrays; group g spans
+    x[offsets[g]:offsets[g+1]]. All roots are found together by a vectorized
+    bisection on the same bracket as the scalar function, so the results
+    agree with it to within `xtol`.
+
+    Args:
+        x: Flat array of measurements of all groups
+        stat_vars: Flat array of statistical variances
+        sys_vars: Flat array of systematic variances
+        offsets: Group boundaries, of length n_groups + 1
+        xtol: Absolute tolerance on the root s
+        rtol: Relative tolerance on the root s
+        max_iter: Maximum number of bisection steps
+
+    Returns:
+        tuple: (systematic variance per group, convergence flag per group).
+        Groups without a sign change in the bracket get 0.0 like the scalar
+        function; empty groups and groups that did not converge within
+        `max_iter` are flagged False.
+    """
+    x         = np.asarray(x,         dtype=np.float64)
+    stat_vars = np.asarray(stat_vars, dtype=np.float64)
+    sys_vars  = np.asarray(sys_vars,  dtype=np.float64)
+    offsets   = np.asarray(offsets,   dtype=np.intp)
+
+    n_groups = len(offsets) - 1
+    N = np.diff(offsets)
+    group = np.repeat(np.arange(n_groups), N)
+
+    def group_sum(values):
+        return np.bincount(group, weights=values, minlength=n_groups)
+
+    xVar = stat_vars + sys_vars
+    non_empty = N > 0
+    N_safe = np.where(non_empty, N, 1)
+
+
+    def getChi2(s):
+        varTotal = xVar + s[group]**2
+        weights = 1 / varTotal
+        xHat = group_sum(x * weights) / np.where(non_empty, group_sum(weights), 1.)
+        return group_sum((x - xHat[group])**2 / varTotal) - (N - 1)
+
+
+    mean = group_sum(x) / N_safe
+    sMax = np.sqrt(group_sum((x - mean[group])**2) / N_safe) * 10 + 0.01
+
+    lo = np.full(n_groups, 1e-10)
+    hi = sMax.copy()
+    chiLow  = getChi2(lo)
+    chiHigh = getChi2(hi)
+
+    has_root  = non_empty & (chiLow * chiHigh <= 0)
+    # Exact zeros at the bracket ends are returned as is, like brentq does
+    at_low    = has_root & (chiLow == 0)
+    at_high   = has_root & (chiHigh == 0) & ~at_low
+    converged = non_empty & (~has_root | at_low | at_high)
+    active    = has_root & ~converged
+
+    for _ in range(max_iter):
+        if not np.any(active):
+            break
+
+        mid = 0.5 * (lo + hi)
+        chiMid = getChi2(mid)
+
+        go_low = (chiLow * chiMid <= 0) & active
+        go_high = ~go_low & active
+        hi = np.where(go_low, mid, hi)
+        lo = np.where(go_high, mid, lo)
+        chiLow = np.where(go_high, chiMid, chiLow)
+
+        done = active & (hi - lo <= xtol + rtol * np.abs(mid))
+        converged |= done
+        active &= ~done
+
+    root = np.where(at_low, lo, np.where(at_high, sMax, 0.5 * (lo + hi)))
+    result = np.where(has_root, root**2, 0.0)
+    result[~non_empty] = np.nan
+
+    return result, converged
@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+from ddfUtils.misc import get_all_files, iter_files
+
+
+@pytest.fixture
+def run_tree(tmp_path):
+    """data_YYYY/run_NNNNNN/sndsw_raw-NNNN.root, with a hidden file, a symlinked run and a loop"""
+    for year in (2022, 2023):
+        for run in range(3):
+            run_dir = tmp_path / f"data_{year}" / f"run_{year}{run:02d}"
+            run_dir.mkdir(parents=True)
+            for i in range(2):
+                (run_dir / f"sndsw_raw-{i:04d}.root").touch()
+            (run_dir / ".hidden.root").touch()
+    (tmp_path / "data_2022" / "notes.txt").touch()
+    (tmp_path / "elsewhere" / "run_999999").mkdir(parents=True)
+    (tmp_path / "elsewhere" / "run_999999" / "sndsw_raw-0000.root").touch()
+    os.symlink(tmp_path / "elsewhere" / "run_999999", tmp_path / "data_2023" / "run_999999")
+    os.symlink(tmp_path / "data_2023", tmp_path / "data_2023" / "run_202300" / "loop")
+    return tmp_path
+
+
+@pytest.mark.parametrize("input_dir, files", [
+    ("{root}/data_2022", "run_*/sndsw_raw-*.root"),
+    ("{root}/data_*", "run_*/sndsw_raw-*.root"),
+    ("{root}/data_*/", "run_*/*.root"),
+    ("{root}//data_202?", "*/.*"),
+    ("{root}/data_*/run_2022*", "*"),
+    ("{root}/data_2023", "run_*/loop/run_*/sndsw_raw-0000.root"),
+    ("{root}/data_2022/run_202200", "sndsw_raw-0000.root"),
+    ("{root}/data_*", "run_*/"),
+    ("{root}/missing_*", "*"),
+])
+def test_get_all_files_max_workers_matches_glob(run_tree, input_dir, files):
+    input_dir = input_dir.format(root=run_tree)
+    expected = get_all_files(input_dir, files)
+
+    assert get_all_files(input_dir, files, max_workers=4) == expected
+    assert list(iter_files(input_dir, files)) == expected
+    assert sorted(iter_files(input_dir, files, max_workers=2, ordered=True)) == sorted(expected)
+    assert list(iter_files(input_dir, files, ordered=True)) == list(iter_files(input_dir, files, max_workers=3, ordered=True))
+
+
+def test_get_all_files_wildcard_input_dir(run_tree):
+    files = get_all_files(f"{run_tree}/data_*", "run_*/sndsw_raw-*.root", max_workers=4)
+    assert len(files) == 2 * 3 * 2 + 1
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from ddfUtils.stats import EfficiencyAccumulator, get_eff_with_error, get_weighted_eff_with_error
+
+
+EDGES = np.linspace(0., 1., 11)
+
+
+def _bin_sums(x, passed_mask, weights) -> tuple:
+    """(passed sum(w), passed sum(w^2), total sum(w), total sum(w^2)) per bin, one entry at a time"""
+    n_bins = len(EDGES) - 1
+    sums = np.zeros((4, n_bins))
+    for xi, pi, wi in zip(x, passed_mask, weights):
+        i = np.searchsorted(EDGES, xi, side="right") - 1
+        if not 0 <= i < n_bins:
+            continue
+        sums[2:, i] += wi, wi**2
+        if pi:
+            sums[:2, i] += wi, wi**2
+    return tuple(sums)
+
+
+@pytest.fixture
+def entries():
+    rng = np.random.default_rng(1)
+    n = 1000
+    x = rng.uniform(-0.1, 1.1, n)
+    passed_mask = rng.uniform(size=n) < 0.3 + 0.5 * x
+    weights = rng.uniform(0.5, 3., n)
+    return x, passed_mask, weights
+
+
+def test_unweighted_fill(entries):
+    x, passed_mask, _ = entries
+    acc = EfficiencyAccumulator(EDGES).fill(x, passed_mask)
+    passed, _, total, _ = _bin_sums(x, passed_mask, np.ones(len(x)))
+
+    np.testing.assert_allclose(acc.result(), get_eff_with_error(passed, total, stat_option="Clopper Pearson"))
+
+
+def test_single_weighted_fill_sumw2():
+    acc = EfficiencyAccumulator(EDGES).fill([0.05, 0.05], [True, False], [2., 3.])
+
+    assert acc.total_sumw2[0] == 13.
+    assert acc.passed_sumw2[0] == 4.
+
+
+@pytest.mark.parametrize("n_unweighted", [0, 500])
+def test_weighted_fill(entries, n_unweighted):
+    x, passed_mask, weights = entries
+    weights = np.concatenate([np.ones(n_unweighted), weights[n_unweighted:]])
+
+    acc = EfficiencyAccumulator(EDGES)
+    if n_unweighted:
+        acc.fill(x[:n_unweighted], passed_mask[:n_unweighted])
+    for chunk in np.array_split(np.arange(n_unweighted, len(x)), 2):
+        acc.fill(x[chunk], passed_mask[chunk], weights[chunk])
+
+    sums = _bin_sums(x, passed_mask, weights)
+    np.testing.assert_allclose(acc.passed_sumw2, sums[1])
+    np.testing.assert_allclose(acc.total_sumw2, sums[3])
+    np.testing.assert_allclose(acc.result(), get_weighted_eff_with_error(*sums, stat_option="Normal"))
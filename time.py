@@ -1,4 +1,13 @@
+import json
+import multiprocessing as mp
+import os
+import queue
+import sys
+import threading
 import time
+import tracemalloc
+from contextlib import ContextDecorator
+from typing import TextIO, Union
 
 
 def get_sec_as_hms(duration: float) -> tuple:
@@ -19,7 +28,188 @@ def get_sec_as_hms(duration: float) -> tuple:
 
 
 
-def print_status_with_time(i, i_max, start_time):
+def get_rss() -> Union[int, None]:
+    """
+    Return the current resident set size in bytes, from /proc/self/statm.
+
+    Returns:
+        int or None: RSS, or None where /proc is not available
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def _read_vmhwm() -> Union[int, None]:
+    """Return the kernel RSS high-water mark (VmHWM) in bytes, or None."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, IndexError, ValueError):
+        pass
+    return None
+
+
+# Highest VmHWM seen before a reset made by a StageTimer(reset_peak=True)
+_peak_rss_before_reset = 0
+
+
+def get_peak_rss() -> Union[int, None]:
+    """
+    Return the peak resident set size (VmHWM) in bytes.
+
+    The value is the peak since process start or since the last
+    reset_peak_rss() call. Resets made by StageTimer(reset_peak=True) do
+    not lower it.
+
+    Returns:
+        int or None: Peak RSS, or None where /proc is not available
+    """
+    peak = _read_vmhwm()
+    if peak is None:
+        return None
+    return max(peak, _peak_rss_before_reset)
+
+
+def _reset_kernel_peak_rss() -> bool:
+    """Reset VmHWM to the current RSS, keeping the old value for get_peak_rss()."""
+    global _peak_rss_before_reset
+    _peak_rss_before_reset = max(_peak_rss_before_reset, _read_vmhwm() or 0)
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def reset_peak_rss() -> bool:
+    """
+    Reset the peak RSS to the current RSS (Linux >= 4.0).
+
+    Returns:
+        bool: Whether the reset succeeded
+    """
+    global _peak_rss_before_reset
+    success = _reset_kernel_peak_rss()
+    _peak_rss_before_reset = 0
+    return success
+
+
+def get_bytes_as_str(n_bytes: Union[int, float, None]) -> str:
+    """
+    Format a number of bytes with a binary unit, e.g. '1.23 GiB'.
+    """
+    if n_bytes is None:
+        return "n/a"
+    value = float(n_bytes)
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(value) < 1024:
+            return f"{value:.2f} {unit}"
+        value /= 1024
+    return f"{value:.2f} TiB"
+
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+class MemoryMonitor:
+    """
+    Track RSS, peak RSS and RSS growth rate between samples.
+
+    If `tracemalloc_threshold` is set, tracemalloc is started and the first
+    sample whose RSS exceeds the threshold writes the top `top_n` allocation
+    sites to `stream`. Note that tracemalloc slows down allocations.
+
+    Args:
+        tracemalloc_threshold: RSS in bytes that triggers the snapshot
+        top_n: Number of allocation sites in the snapshot
+        stream: Output stream of the snapshot (default is sys.stderr)
+    """
+
+    def __init__(
+        self,
+        tracemalloc_threshold: Union[int, None] = None,
+        top_n:                 int = 10,
+        stream:                Union[TextIO, None] = None
+    ):
+        self.tracemalloc_threshold = tracemalloc_threshold
+        self.top_n = top_n
+        self.stream = sys.stderr if stream is None else stream
+        self.snapshot = None
+
+        self.rss = get_rss()
+        self.peak_rss = get_peak_rss()
+        self.rate = 0.
+        self._last_time = time.time()
+
+        if tracemalloc_threshold is not None and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+    def sample(self) -> tuple:
+        """
+        Read the memory usage.
+
+        Returns:
+            tuple: (RSS, peak RSS, RSS growth rate in bytes/s)
+        """
+        now = time.time()
+        rss = get_rss()
+        if rss is not None and self.rss is not None and now > self._last_time:
+            self.rate = (rss - self.rss) / (now - self._last_time)
+        self.rss = rss
+        self.peak_rss = get_peak_rss()
+        self._last_time = now
+
+        if (self.tracemalloc_threshold is not None and self.snapshot is None
+                and rss is not None and rss > self.tracemalloc_threshold):
+            self._take_snapshot()
+
+        return self.rss, self.peak_rss, self.rate
+
+
+    def _take_snapshot(self):
+        self.snapshot = tracemalloc.take_snapshot()
+        stats = self.snapshot.statistics("lineno")[:self.top_n]
+
+        self.stream.write(
+            f"RSS {get_bytes_as_str(self.rss)} exceeded {get_bytes_as_str(self.tracemalloc_threshold)}, "
+            f"top {len(stats)} allocation sites:\n"
+        )
+        for stat in stats:
+            self.stream.write(f"    {stat}\n")
+        self.stream.flush()
+
+
+    def format(self) -> str:
+        """
+        Sample and return 'RSS ... (peak ..., +... /s)'.
+        """
+        self.sample()
+        sign = "+" if self.rate >= 0 else "-"
+        return (
+            f"RSS {get_bytes_as_str(self.rss)} (peak {get_bytes_as_str(self.peak_rss)}, "
+            f"{sign}{get_bytes_as_str(abs(self.rate))}/s)"
+        )
+
+
+_status_memory_monitor = None
+
+
+def _get_status_memory() -> str:
+    global _status_memory_monitor
+    if _status_memory_monitor is None:
+        _status_memory_monitor = MemoryMonitor()
+    return _status_memory_monitor.format()
+
+
+
+def print_status_with_time(i, i_max, start_time, memory: bool = False):
     """
     Print status with elapsed time in formatted output.
 
@@ -27,6 +217,7 @@ def print_status_with_time(i, i_max, start_time):
         i: Current iteration number
         i_max: Maximum number of iterations
         start_time: Start time of process
+        memory: Append current RSS, peak RSS and RSS growth rate
 
     Raises:
         ValueError: If i or i_max are negative, or if i_max is zero
@@ -49,11 +240,13 @@ def print_status_with_time(i, i_max, start_time):
     out4 = "\033[1;34m" + f"{h:02d}:{m:02d}:{round(s):02d}\033[0m"
     out5 = " (hh:mm:ss)"
     out  = out1 + out2 + out3 + out4 + out5
+    if memory:
+        out += " " + _get_status_memory()
 
     if i+1 != i_max: print(out,        flush=True, end=" ")
     else:           print(f"{out}\n", flush=True, end="\n")
 
-def print_status(i, i_max, start_time: float, count: int = 0) -> int:
+def print_status(i, i_max, start_time: float, count: int = 0, memory: bool = False) -> int:
     """
     Print periodic status updates.
 
@@ -62,14 +255,675 @@ def print_status(i, i_max, start_time: float, count: int = 0) -> int:
         i_max: Maximum number of iterations
         start_time: Start time of process
         count: Counter for controlling update frequency
+        memory: Append current RSS, peak RSS and RSS growth rate
 
     Returns:
         int: Updated count value
     """
     if (time.time() - start_time > count):
-        print_status_with_time(i, i_max, start_time)
+        print_status_with_time(i, i_max, start_time, memory)
         count += 1
     elif (i == i_max-1):
-        print_status_with_time(i, i_max, start_time)
+        print_status_with_time(i, i_max, start_time, memory)
 
     return count
+
+
+
+
+def _format_hms(duration: float) -> str:
+    h, m, s = get_sec_as_hms(duration)
+    return f"{h:02d}:{m:02d}:{int(s):02d}"
+
+
+class ProgressTracker:
+    """
+    Low-overhead progress reporting for long event loops.
+
+    update(i) only compares `i` with the next checkpoint; the clock is read
+    every `check_every` iterations, where `check_every` is re-estimated from
+    the observed throughput so that checks happen about every
+    `check_interval` seconds. A status line with the rate and ETA is printed
+    at most every `interval` seconds and always for the last entry. When the
+    stream is not a TTY, plain log lines are written instead of the
+    in-place colored line.
+
+    Args:
+        i_max: Total number of iterations
+        interval: Minimum time between printed lines (s)
+        check_interval: Target time between clock reads (s)
+        stream: Output stream (default is sys.stdout)
+        plain: Force plain log lines (default is to detect a non-TTY stream)
+        memory: Append RSS, peak RSS and RSS growth rate, or pass a
+            MemoryMonitor to also get its tracemalloc snapshot
+
+    Raises:
+        ValueError: If i_max is not positive
+
+    Example:
+        tracker = ProgressTracker(n_entries)
+        for i in range(n_entries):
+            ...
+            tracker.update(i)
+    """
+
+    def __init__(
+        self,
+        i_max:          int,
+        interval:       float = 1.0,
+        check_interval: float = 0.05,
+        stream:         Union[TextIO, None] = None,
+        plain:          Union[bool, None]   = None,
+        memory:         Union[bool, MemoryMonitor] = False
+    ):
+        if i_max <= 0:
+            raise ValueError("Total number of entries should be positive!")
+
+        self.i_max = i_max
+        self.interval = interval
+        self.check_interval = check_interval
+        self.memory = MemoryMonitor() if memory is True else (memory or None)
+        self.stream = sys.stdout if stream is None else stream
+        if plain is None:
+            plain = not (hasattr(self.stream, "isatty") and self.stream.isatty())
+        self.plain = plain
+
+        self.start_time = time.time()
+        self.check_every = 1
+        self._next_check = 0
+        self._last_check_time = self.start_time
+        self._last_check_i = 0
+        self._last_print_time = -float("inf")
+        self._finished = False
+
+
+    def update(self, i: int):
+        """
+        Report that iteration `i` (0-based) is being processed.
+        """
+        if i >= self._next_check:
+            self._check(i)
+
+    __call__ = update
+
+
+    def _check(self, i: int):
+        now = time.time()
+        dt = now - self._last_check_time
+
+        if dt > 0 and i > self._last_check_i:
+            rate = (i - self._last_check_i) / dt
+            # Grow at most 2x per check so a slow start does not overshoot
+            self.check_every = int(max(1, min(rate * self.check_interval, 2 * self.check_every)))
+        self._last_check_time = now
+        self._last_check_i = i
+        self._next_check = min(i + self.check_every, self.i_max - 1)
+
+        is_last = i + 1 >= self.i_max
+        if is_last or now - self._last_print_time >= self.interval:
+            self._print(i, now, is_last)
+            self._last_print_time = now
+
+
+    def _print(self, i: int, now: float, is_last: bool):
+        elapsed = now - self.start_time
+        done = i + 1
+        percent = done * 100 / self.i_max
+        rate = done / elapsed if elapsed > 0 else 0.
+        eta = (self.i_max - done) / rate if rate > 0 else 0.
+
+        if self.plain:
+            self.stream.write(
+                f"[{percent:6.2f}%] {done:,}/{self.i_max:,} "
+                f"elapsed {_format_hms(elapsed)} ETA {_format_hms(eta)} ({rate:,.1f} ev/s)"
+                + (f" {self.memory.format()}" if self.memory else "") + "\n"
+            )
+        else:
+            out1 = "\r\033[1;31m >>"
+            out2 = " \033[1;32m[" + f"{percent:.02f}".zfill(5) + "%]\033[0m".ljust(13)
+            out3 = f"{done:,}/{self.i_max:,}".ljust(25)
+            out4 = "\033[1;34m" + _format_hms(elapsed) + "\033[0m"
+            out5 = f" ETA \033[1;34m{_format_hms(eta)}\033[0m ({rate:,.1f} ev/s)"
+            out6 = f" {self.memory.format()}" if self.memory else ""
+            self.stream.write(out1 + out2 + out3 + out4 + out5 + out6 + ("\n" if is_last else " "))
+
+        self.stream.flush()
+        if is_last:
+            self._finished = True
+
+
+    def close(self):
+        """Print the final line if the loop stopped before the last entry."""
+        if not self._finished and self._last_check_i > 0:
+            self._print(self._last_check_i, time.time(), True)
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+
+
+class StageNode:
+    """
+    Accumulated timing of one stage path.
+
+    Attributes:
+        name: Stage name
+        calls: Number of times the stage was entered
+        wall: Total wall time (s)
+        cpu: Total process CPU time (s)
+        items: Number of items processed, see add_items
+        rss_peak: Highest RSS seen while the stage ran (bytes, memory timers only)
+        rss_delta: Total RSS change over all calls (bytes, memory timers only)
+        children: Sub-stages by name
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.wall = 0.
+        self.cpu = 0.
+        self.items = 0
+        self.rss_peak = 0
+        self.rss_delta = 0
+        self.children = {}
+
+
+    def add_items(self, n: int = 1):
+        """Count `n` more items processed in this stage."""
+        self.items += n
+
+
+    @property
+    def self_wall(self) -> float:
+        """Wall time not spent in sub-stages (s)."""
+        return max(0., self.wall - sum(c.wall for c in self.children.values()))
+
+
+    def child(self, name: str) -> "StageNode":
+        if name not in self.children:
+            self.children[name] = StageNode(name)
+        return self.children[name]
+
+
+    def to_dict(self) -> dict:
+        return {
+            "name":     self.name,
+            "calls":    self.calls,
+            "wall":     self.wall,
+            "cpu":      self.cpu,
+            "items":    self.items,
+            "rss_peak":  self.rss_peak,
+            "rss_delta": self.rss_delta,
+            "children": [c.to_dict() for c in self.children.values()],
+        }
+
+
+class _Stage(ContextDecorator):
+    """Context manager and decorator timing one stage of a StageTimer."""
+
+    def __init__(self, timer: "StageTimer", name: str, items: int):
+        self.timer = timer
+        self.name = name
+        self.items = items
+
+    def __enter__(self) -> StageNode:
+        stack = self.timer._get_stack()
+        node = stack[-1][0].child(self.name)
+        node.calls += 1
+        node.items += self.items
+
+        rss = self.timer._mark_memory(stack)
+        stack.append([node, time.perf_counter(), time.process_time(), rss, rss or 0])
+        return node
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        stack = self.timer._get_stack()
+        wall_end, cpu_end = time.perf_counter(), time.process_time()
+        rss = self.timer._mark_memory(stack)
+
+        node, wall_start, cpu_start, rss_start, rss_peak = stack.pop()
+        node.wall += wall_end - wall_start
+        node.cpu  += cpu_end - cpu_start
+        if rss is not None:
+            node.rss_peak = max(node.rss_peak, rss_peak)
+            node.rss_delta += rss - rss_start
+        return False
+
+
+class StageTimer:
+    """
+    Hierarchical wall/CPU timer for the stages of a job.
+
+    Stages nest according to the order they are entered; each thread keeps
+    its own stack, so stages entered in worker threads hang directly off
+    the root. CPU time is process CPU time.
+
+    With `memory=True` every stage also records its RSS change and RSS
+    high-water mark. The RSS is sampled at every stage boundary; when the
+    kernel peak (VmHWM) has grown since the previous boundary, the new peak
+    is folded into all open stages. Spikes that do not exceed an earlier
+    process peak are only seen through the boundary samples.
+
+    With `reset_peak=True` VmHWM is also reset at every boundary, so every
+    spike between boundaries is caught. This changes the process-wide
+    counter seen by other tools reading /proc; get_peak_rss() and
+    MemoryMonitor keep reporting the true process peak.
+
+    Args:
+        memory: Record per-stage memory usage
+        reset_peak: Reset the kernel peak at every stage boundary (Linux >= 4.0)
+
+    Example:
+        timer = StageTimer()
+        with timer.stage("read") as s:
+            s.add_items(len(events))
+            with timer.stage("decode"):
+                ...
+
+        @timer.stage("select")
+        def select(events): ...
+
+        print(timer.report())
+        timer.dump("job_timing")
+    """
+
+    def __init__(self, memory: bool = False, reset_peak: bool = False):
+        self.memory = memory
+        self.reset_peak = reset_peak
+        self.root = StageNode("total")
+        self._start_time = time.perf_counter()
+        self._local = threading.local()
+        self._last_hwm = _read_vmhwm() if memory else None
+        self._can_reset_peak = memory and reset_peak and _reset_kernel_peak_rss()
+        self._start_rss = get_rss() if memory else None
+
+
+    def _get_stack(self) -> list:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = [[self.root, None, None, None, 0]]
+        return self._local.stack
+
+
+    def _mark_memory(self, stack: list) -> Union[int, None]:
+        """Fold the RSS peak since the last mark into all open stages and return the RSS."""
+        if not self.memory:
+            return None
+
+        rss = get_rss()
+        hwm = _read_vmhwm()
+        if self._can_reset_peak:
+            peak = hwm
+            _reset_kernel_peak_rss()
+        else:
+            # VmHWM only grows, so a larger value was reached since the last mark
+            peak = hwm if hwm is not None and self._last_hwm is not None and hwm > self._last_hwm else rss
+            self._last_hwm = hwm
+
+        peak = max(peak or 0, rss or 0)
+        for frame in stack:
+            frame[4] = max(frame[4], peak)
+        self.root.rss_peak = max(self.root.rss_peak, peak)
+        return rss
+
+
+    def stage(self, name: str, items: int = 0) -> _Stage:
+        """
+        Time a stage, as `with timer.stage(name):` or `@timer.stage(name)`.
+
+        Args:
+            name: Stage name
+            items: Number of items processed per call
+        """
+        return _Stage(self, name, items)
+
+
+    def reset(self):
+        self.__init__(self.memory, self.reset_peak)
+
+
+    def _finalize_root(self):
+        self.root.calls = 1
+        self.root.wall = time.perf_counter() - self._start_time
+        self.root.cpu = sum(c.cpu for c in self.root.children.values())
+        self.root.items = sum(c.items for c in self.root.children.values())
+
+        # The root spans from construction (or reset) to now
+        rss = self._mark_memory([])
+        if rss is not None and self._start_rss is not None:
+            self.root.rss_delta = rss - self._start_rss
+
+
+    def report(self) -> str:
+        """
+        Return the stage tree as a text table.
+        """
+        self._finalize_root()
+        header = f"{'stage':<32}{'calls':>10}{'wall (s)':>12}{'%':>7}{'self (s)':>12}{'cpu (s)':>12}{'items':>12}{'items/s':>12}"
+        if self.memory:
+            header += f"{'peak RSS':>14}{'RSS change':>14}"
+        lines = [header]
+
+        def add_lines(node, depth, parent_wall):
+            percent = 100 * node.wall / parent_wall if parent_wall > 0 else 100.
+            rate = f"{node.items / node.wall:,.1f}" if node.items and node.wall > 0 else ""
+            line = (
+                f"{'  ' * depth + node.name:<32}{node.calls:>10,}{node.wall:>12.3f}{percent:>7.1f}"
+                f"{node.self_wall:>12.3f}{node.cpu:>12.3f}{node.items or '':>12}{rate:>12}"
+            )
+            if self.memory:
+                line += f"{get_bytes_as_str(node.rss_peak):>14}{get_bytes_as_str(node.rss_delta):>14}"
+            lines.append(line)
+            for c in node.children.values():
+                add_lines(c, depth + 1, node.wall)
+
+        add_lines(self.root, 0, self.root.wall)
+        return "\n".join(lines)
+
+
+    def to_dict(self) -> dict:
+        self._finalize_root()
+        return self.root.to_dict()
+
+
+    def collapsed_stacks(self) -> str:
+        """
+        Return the self wall time of every stage path in the collapsed-stack
+        format read by flamegraph.pl / speedscope ("a;b;c <microseconds>").
+        """
+        self._finalize_root()
+        lines = []
+
+        def add_lines(node, path):
+            path = f"{path};{node.name}" if path else node.name
+            us = int(round(node.self_wall * 1e6))
+            if us > 0:
+                lines.append(f"{path} {us}")
+            for c in node.children.values():
+                add_lines(c, path)
+
+        add_lines(self.root, "")
+        return "\n".join(lines) + "\n"
+
+
+    def dump(self, prefix: str, print_filename: bool = True):
+        """
+        Write the report to `prefix`.txt, `prefix`.json and `prefix`.collapsed.
+        """
+        with open(f"{prefix}.txt", "w") as f:
+            f.write(self.report() + "\n")
+        with open(f"{prefix}.json", "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        with open(f"{prefix}.collapsed", "w") as f:
+            f.write(self.collapsed_stacks())
+
+        if print_filename:
+            print(f"Output files: {prefix}.txt, {prefix}.json, {prefix}.collapsed")
+
+
+_stage_timer = StageTimer()
+
+
+def get_stage_timer() -> StageTimer:
+    """Return the module-wide StageTimer used by stage()."""
+    return _stage_timer
+
+
+def stage(name: str, items: int = 0) -> _Stage:
+    """
+    Time a stage with the module-wide StageTimer.
+
+    Usable as `with stage("read"):` or as the decorator `@stage("read")`.
+    """
+    return _stage_timer.stage(name, items)
+
+
+
+
+class ProgressCounter:
+    """
+    Worker-side handle of a ProgressService.
+
+    Counts are accumulated locally and pushed to the service queue at most
+    every `flush_interval` seconds, so update() is cheap enough for event
+    loops. As in ProgressTracker, the clock is read every `check_every`
+    calls, re-estimated from the call rate (at most every 1024 calls), so
+    workers that update once per chunk still report on time. Instances are
+    picklable and can be passed as task arguments to a multiprocessing pool.
+    """
+
+    def __init__(self, queue, flush_interval: float = 0.5):
+        self.queue = queue
+        self.flush_interval = flush_interval
+        self.check_every = 1
+        self._pending = 0
+        self._calls = 0
+        self._last_flush = time.time()
+        self._last_check = self._last_flush
+
+
+    def __getstate__(self):
+        return {"queue": self.queue, "flush_interval": self.flush_interval}
+
+
+    def __setstate__(self, state):
+        self.__init__(state["queue"], state["flush_interval"])
+
+
+    def update(self, n: int = 1):
+        """Count `n` more processed entries."""
+        self._pending += n
+        self._calls += 1
+        if self._calls >= self.check_every:
+            self._check()
+
+    __call__ = update
+
+
+    def _check(self):
+        now = time.time()
+        dt = now - self._last_check
+
+        # Aim for ~10 clock reads per flush interval, growing at most 2x per check
+        target = self._calls / dt * self.flush_interval / 10 if dt > 0 else float("inf")
+        self.check_every = int(max(1, min(target, 2 * self.check_every, 1024)))
+        self._calls = 0
+        self._last_check = now
+
+        if now - self._last_flush >= self.flush_interval:
+            self.flush()
+
+
+    def flush(self, finished: bool = False):
+        """Push the pending count to the service."""
+        now = time.time()
+        if self._pending or finished:
+            self.queue.put((os.getpid(), self._pending, now, finished))
+        self._pending = 0
+        self._last_flush = now
+
+
+    def close(self):
+        """Flush and mark the current task as finished."""
+        self.flush(finished=True)
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ProgressService:
+    """
+    Combined progress reporting for a pool of worker processes.
+
+    Workers receive a ProgressCounter from counter() and push their counts
+    through a multiprocessing.Manager queue. A single reporter thread in
+    this process drains the queue and renders, every `interval` seconds,
+    the combined throughput and ETA and the rate of each worker process.
+    Workers whose recent rate is below `straggler_fraction` of the median,
+    or that have been silent for `straggler_timeout` seconds, are flagged.
+
+    Args:
+        i_max: Total number of entries over all workers
+        interval: Time between rendered reports (s)
+        stream: Output stream (default is sys.stdout)
+        plain: Force plain log lines (default is to detect a non-TTY stream)
+        straggler_fraction: Rate fraction of the median below which a worker is flagged
+        straggler_timeout: Silence (s) after which an active worker is flagged
+
+    Example:
+        with ProgressService(n_entries) as progress, mp.Pool(8) as pool:
+            pool.starmap(process_file, [(f, progress.counter()) for f in files])
+
+        def process_file(path, counter):
+            with counter:
+                for event in read(path):
+                    ...
+                    counter.update()
+    """
+
+    def __init__(
+        self,
+        i_max:              int,
+        interval:           float = 1.0,
+        stream:             Union[TextIO, None] = None,
+        plain:              Union[bool, None]   = None,
+        straggler_fraction: float = 0.5,
+        straggler_timeout:  float = 10.0
+    ):
+        if i_max <= 0:
+            raise ValueError("Total number of entries should be positive!")
+
+        self.i_max = i_max
+        self.interval = interval
+        self.stream = sys.stdout if stream is None else stream
+        if plain is None:
+            plain = not (hasattr(self.stream, "isatty") and self.stream.isatty())
+        self.plain = plain
+        self.straggler_fraction = straggler_fraction
+        self.straggler_timeout = straggler_timeout
+
+        self.done = 0
+        self.workers = {}
+        self._manager = None
+        self._queue = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._n_lines = 0
+
+
+    def start(self) -> "ProgressService":
+        self._manager = mp.Manager()
+        self._queue = self._manager.Queue()
+        self.start_time = time.time()
+        self._last_render = self.start_time
+        self._thread = threading.Thread(target=self._run, name="ProgressService", daemon=True)
+        self._thread.start()
+        return self
+
+
+    def counter(self, flush_interval: float = 0.5) -> ProgressCounter:
+        """Return a picklable counter for a worker task."""
+        if self._queue is None:
+            raise RuntimeError("ProgressService is not started!")
+        return ProgressCounter(self._queue, flush_interval)
+
+
+    def _drain(self, timeout: float):
+        messages = []
+        try:
+            messages.append(self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait())
+            while True:
+                messages.append(self._queue.get_nowait())
+        except (queue.Empty, EOFError, OSError):
+            pass
+
+        for pid, n, timestamp, finished in messages:
+            worker = self.workers.setdefault(pid, {
+                "done": 0, "last_done": 0, "rate": 0., "first_seen": timestamp,
+                "last_seen": timestamp, "tasks": 0, "active": True
+            })
+            worker["done"] += n
+            worker["last_seen"] = max(worker["last_seen"], timestamp)
+            worker["active"] = not finished
+            worker["tasks"] += finished
+            self.done += n
+
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._drain(timeout=min(0.1, self.interval))
+            if time.time() - self._last_render >= self.interval:
+                self._render(final=False)
+
+
+    def _render(self, final: bool):
+        now = time.time()
+        dt = max(now - self._last_render, 1e-9)
+        self._last_render = now
+
+        for worker in self.workers.values():
+            worker["rate"] = (worker["done"] - worker["last_done"]) / dt
+            worker["last_done"] = worker["done"]
+
+        elapsed = now - self.start_time
+        percent = self.done * 100 / self.i_max
+        rate = self.done / elapsed if elapsed > 0 else 0.
+        eta = (self.i_max - self.done) / rate if rate > 0 else 0.
+
+        active_rates = sorted(w["rate"] for w in self.workers.values() if w["active"])
+        median_rate = active_rates[len(active_rates) // 2] if active_rates else 0.
+
+        lines = [
+            f"[{percent:6.2f}%] {self.done:,}/{self.i_max:,} elapsed {_format_hms(elapsed)} "
+            f"ETA {_format_hms(eta)} ({rate:,.1f} ev/s, {len(active_rates)} active workers)"
+        ]
+        for pid, worker in sorted(self.workers.items()):
+            is_straggler = worker["active"] and not final and (
+                worker["rate"] < self.straggler_fraction * median_rate
+                or now - worker["last_seen"] > self.straggler_timeout
+            )
+            state = "straggler" if is_straggler else ("active" if worker["active"] else "idle")
+            lines.append(
+                f"    pid {pid:<8}{worker['done']:>14,}{worker['rate']:>14,.1f} ev/s"
+                f"{worker['tasks']:>6} tasks  {state}"
+            )
+
+        if self.plain:
+            self.stream.write("\n".join(lines) + "\n")
+        else:
+            # Move back over the previous report and redraw it in place
+            clear = "\033[F\033[K" * self._n_lines
+            lines[0] = "\033[1;32m" + lines[0] + "\033[0m"
+            self.stream.write(clear + "\n".join(lines) + "\n")
+            self._n_lines = len(lines)
+        self.stream.flush()
+
+
+    def close(self):
+        """Stop the reporter, render the final report and shut the manager down."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._drain(timeout=0)
+        self._render(final=True)
+        self._manager.shutdown()
+        self._thread = None
+
+
+    def __enter__(self):
+        return self.start()
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()